@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import metrics
+
+        if settings.API_METRICS_ENABLED:
+            connection_created.connect(metrics.install_query_timer, dispatch_uid='api_query_timer')
@@ -0,0 +1,81 @@
+"""Async list and retrieve views for ASGI deployments.
+
+DRF views are synchronous, so under an ASGI server every request to them
+runs in a worker thread. `AsyncReadView` answers the read side of a viewset
+on the event loop instead, reusing the viewset's queryset, filters,
+`fields`/`expand` handling, pagination and serializers so responses are the
+same as the synchronous endpoints.
+
+Queries go through Django's async ORM interface (`aget`, and the paginator
+in `sync_to_async`, which is how Django 4.1 runs async queries). Serializers
+run in `sync_to_async` too: they read and fill `api.cache`, whose backend
+may be synchronous only (database cache) or block the loop (file cache).
+ETag validation is not done on these views.
+"""
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
+from django.views import View
+
+from .renderers import FastJSONRenderer
+
+
+class AsyncReadView(View):
+
+    """Async `list` (without `pk`) and `retrieve` (with `pk`) of `viewset_class`."""
+
+    viewset_class = None
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, pk=None):
+        viewset = self.get_viewset(request, 'list' if pk is None else 'retrieve', pk)
+        try:
+            viewset.check_permissions(viewset.request)
+            if pk is None:
+                data = await self.list(viewset)
+            else:
+                data = await self.retrieve(viewset, pk)
+        except APIException as exc:
+            # Same body as DRF's default exception handler.
+            if isinstance(exc.detail, (dict, list)):
+                return self.render(exc.detail, status=exc.status_code)
+            return self.render({'detail': exc.detail}, status=exc.status_code)
+        return self.render(data)
+
+    def get_viewset(self, request, action, pk):
+        viewset = self.viewset_class(
+            action=action, args=(), kwargs={} if pk is None else {'pk': pk}, format_kwarg=None)
+        viewset.request = Request(request, parser_context={'view': viewset})
+        viewset.headers = {}
+        return viewset
+
+    async def list(self, viewset):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        paginator = viewset.paginator
+        if paginator is None:
+            instances = [instance async for instance in queryset]
+            return await sync_to_async(self.serialize)(viewset, instances, many=True)
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, viewset.request, viewset)
+        return await sync_to_async(self.serialize_page)(viewset, page)
+
+    async def retrieve(self, viewset, pk):
+        try:
+            instance = await viewset.get_queryset().aget(pk=pk)
+        except ObjectDoesNotExist:
+            raise NotFound()
+        return await sync_to_async(self.serialize)(viewset, instance)
+
+    def serialize(self, viewset, instance, many=False):
+        return viewset.get_serializer(instance, many=many).data
+
+    def serialize_page(self, viewset, page):
+        data = self.serialize(viewset, page, many=True)
+        return viewset.paginator.get_paginated_response(data).data
+
+    def render(self, data, status=200):
+        return HttpResponse(
+            FastJSONRenderer().render(data), status=status, content_type='application/json')
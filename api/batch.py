@@ -0,0 +1,100 @@
+"""Run many v1 read requests in one HTTP request, see `api.views.BatchView`.
+
+Sub-requests call the views directly: they skip the middleware and keep
+the `Response.data` of each view, which is rendered once with the batch.
+Identical sub-requests are only run once, and properties and listings
+embedded many times are serialized once thanks to `api.cache`.
+"""
+
+import io
+from urllib.parse import urlsplit
+
+from rest_framework.views import APIView
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+
+API_NAMESPACE = 'api:v1'
+
+# Headers not forwarded to sub-requests: the body is the batch's and
+# conditional headers would answer sub-requests with an empty 304.
+SKIPPED_META = (
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+    'HTTP_IF_NONE_MATCH', 'HTTP_IF_UNMODIFIED_SINCE',
+)
+
+
+class SubRequestError(Exception):
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def resolve_view(path, urlconf=None):
+    """Return the resolver match of a v1 DRF view, raise `SubRequestError` otherwise."""
+    try:
+        match = resolve(path, urlconf)
+    except Resolver404:
+        raise SubRequestError(404, 'Not found.')
+    view_class = getattr(match.func, 'cls', None)
+    if (
+        not match.namespace.startswith(API_NAMESPACE)
+        or view_class is None
+        or not issubclass(view_class, APIView)
+        or not getattr(view_class, 'batchable', True)
+    ):
+        raise SubRequestError(400, 'Only API v1 endpoints can be batched.')
+    return match
+
+
+def make_request(request, path, query_string):
+    """Return a GET request for `path` sharing the batch request's environ."""
+    meta = {key: value for key, value in request.META.items() if key not in SKIPPED_META}
+    meta.update({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'wsgi.input': io.BytesIO(),
+    })
+    subrequest = WSGIRequest(meta)
+    for attr in ('user', 'session', 'urlconf'):
+        if hasattr(request, attr):
+            setattr(subrequest, attr, getattr(request, attr))
+    return subrequest
+
+
+def run_one(request, url):
+    parts = urlsplit(url)
+    match = resolve_view(parts.path, getattr(request, 'urlconf', None))
+    subrequest = make_request(request, parts.path, parts.query)
+    subrequest.resolver_match = match
+    response = match.func(subrequest, *match.args, **match.kwargs)
+    if not hasattr(response, 'data'):
+        raise SubRequestError(400, 'Streamed responses can not be batched.')
+    return {'status': response.status_code, 'body': response.data}
+
+
+def run(request, urls):
+    """Run GET requests for `urls` and return their status and data, in order.
+
+    `request` is the Django request of the batch.
+    """
+    results = {}
+    responses = []
+    for url in urls:
+        key = normalize(url)
+        if key not in results:
+            try:
+                results[key] = run_one(request, url)
+            except SubRequestError as exc:
+                results[key] = {'status': exc.status, 'body': {'detail': exc.detail}}
+        responses.append(results[key])
+    return responses
+
+
+def normalize(url):
+    """Return a key equal for urls only differing by the order of their parameters."""
+    parts = urlsplit(url)
+    return parts.path, '&'.join(sorted(parts.query.split('&'))) if parts.query else ''
@@ -0,0 +1,63 @@
+"""Cache of serialized representations.
+
+Representations are stored in the cache configured by `API_CACHE_ALIAS`
+under a key made of the model label and the primary key, together with a
+version (usually `updated_at`). An entry is only used when its version
+matches the instance being serialized, and entries are deleted by save and
+delete signals so stale ones do not use space.
+"""
+
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def make_key(model, pk):
+    return 'api:{}:{}'.format(model._meta.label_lower, pk)
+
+
+def count(name, value=1):
+    with _lock:
+        _stats[name] += value
+
+
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else None
+    return stats
+
+
+def reset_stats():
+    with _lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def lookup(model, pk, version):
+    cached = get_cache().get(make_key(model, pk))
+    if cached is not None and cached[0] == version:
+        count('hits')
+        return cached[1]
+    count('misses')
+    return None
+
+
+def store(model, pk, version, data):
+    get_cache().set(make_key(model, pk), (version, data))
+
+
+def invalidate(model, pks):
+    keys = [make_key(model, pk) for pk in pks]
+    if keys:
+        get_cache().delete_many(keys)
+        count('invalidations', len(keys))
@@ -0,0 +1,72 @@
+"""Response compression, see `api.middleware.CompressionMiddleware`.
+
+gzip is always available, brotli (`br`) and zstandard (`zstd`) are used
+when the `brotli` and `zstandard` packages are installed.
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def compress_gzip(data):
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def compress_brotli(data):
+    return brotli.compress(data, quality=5)
+
+
+def compress_zstd(data):
+    # Compressors are not thread safe, they are cheap to create.
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+CODECS = {'gzip': compress_gzip}
+if brotli is not None:
+    CODECS['br'] = compress_brotli
+if zstandard is not None:
+    CODECS['zstd'] = compress_zstd
+
+
+def parse_accept_encoding(header):
+    """Return the quality of each coding of an `Accept-Encoding` header."""
+    qualities = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def negotiate(header, encodings):
+    """Return the encoding of `encodings` to use for an `Accept-Encoding` header.
+
+    The client's highest quality wins, ties go to the first of
+    `encodings`. Return None when none is acceptable.
+    """
+    qualities = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
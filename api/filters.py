@@ -0,0 +1,74 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import models
+from django.utils import timezone
+
+
+class FieldFilterBackend(BaseFilterBackend):
+
+    """Filter querysets with the query parameters declared by the view.
+
+    Views declare `filter_fields`, a mapping of query parameter to ORM
+    lookup, e.g. `{'check_in_after': 'check_in__gte'}`. Values are converted
+    with the model field, invalid values return a 400 response.
+    """
+
+    def get_filter_fields(self, view):
+        return getattr(view, 'filter_fields', {})
+
+    def filter_queryset(self, request, queryset, view):
+        filters = {}
+        errors = {}
+        for param, lookup in self.get_filter_fields(view).items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            field = self.get_model_field(queryset.model, lookup)
+            try:
+                value = field.to_python(value)
+            except DjangoValidationError as exc:
+                errors[param] = exc.messages
+                continue
+            if isinstance(field, models.DateTimeField) and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            filters[lookup] = value
+
+        if errors:
+            raise ValidationError(errors)
+        return queryset.filter(**filters)
+
+    def get_model_field(self, model, lookup):
+        """Return the model field a lookup like `listing__property__exact` ends on."""
+        field = None
+        for name in lookup.split('__'):
+            if model is None:
+                break
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                break
+            model = field.related_model
+        return field
+
+    def get_schema_operation_parameters(self, view):
+        parameters = []
+        for param, lookup in self.get_filter_fields(view).items():
+            model = view.get_queryset().model
+            field = self.get_model_field(model, lookup)
+            schema = {'type': 'string'}
+            if isinstance(field, models.DateTimeField):
+                schema['format'] = 'date-time'
+            elif isinstance(field, models.DateField):
+                schema['format'] = 'date'
+            elif isinstance(field, (models.UUIDField, models.ForeignKey)):
+                schema['format'] = 'uuid'
+            parameters.append({
+                'name': param,
+                'required': False,
+                'in': 'query',
+                'description': 'Filter by `{}`.'.format(lookup),
+                'schema': schema,
+            })
+        return parameters
@@ -0,0 +1,223 @@
+"""Stream fixture files and insert their objects in batches.
+
+Used by the `load_fixtures` command. Files are JSON arrays, as written by
+`dumpdata`, or newline delimited JSON with one object per line, optionally
+gzipped. They are parsed incrementally so memory use does not depend on
+their size.
+"""
+
+import gzip
+import json
+import time
+
+from django.apps import apps
+from django.core import serializers
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, reset_queries, transaction
+
+from . import signals
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FixtureError(Exception):
+    pass
+
+
+def open_fixture(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def is_ndjson(path):
+    return path.removesuffix('.gz').endswith(('.ndjson', '.jsonl'))
+
+
+def iter_ndjson(file):
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise FixtureError('Line {}: {}'.format(number, e))
+
+
+def iter_json_array(file, chunk_size=CHUNK_SIZE):
+    """Yield the objects of a JSON array of objects, reading `chunk_size` characters at a time."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    expect = '['
+
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+        if position == len(buffer):
+            if eof:
+                raise FixtureError('Unexpected end of file, the array is not closed.')
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+
+        char = buffer[position]
+        if expect == '[':
+            if char != '[':
+                raise FixtureError('Fixture must be a JSON array.')
+            position += 1
+            expect = 'first'
+        elif expect == ',':
+            if char == ']':
+                return
+            if char != ',':
+                raise FixtureError('Expected "," or "]" at {!r}.'.format(buffer[position:position + 20]))
+            position += 1
+            expect = 'object'
+        elif expect == 'first' and char == ']':
+            return
+        else:
+            try:
+                obj, end = decoder.raw_decode(buffer, position)
+            except ValueError as e:
+                if eof:
+                    raise FixtureError(str(e))
+                # The object is cut by the end of the buffer, read more.
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            if not isinstance(obj, dict):
+                raise FixtureError('Fixture items must be objects.')
+            yield obj
+            position = end
+            expect = ','
+
+
+def iter_objects(path):
+    with open_fixture(path) as file:
+        yield from (iter_ndjson(file) if is_ndjson(path) else iter_json_array(file))
+
+
+def first_model(path):
+    try:
+        for obj in iter_objects(path):
+            return apps.get_model(obj['model'])
+    except (FixtureError, KeyError, LookupError, ValueError) as e:
+        raise FixtureError('{}: Invalid first object: {}'.format(path, e))
+    return None
+
+
+def sort_paths(paths):
+    """Sort fixture files so the models they start with are loaded before models referring to them."""
+    app_list = [(app_config, None) for app_config in apps.get_app_configs()]
+    order = {model: index for index, model in enumerate(
+        serializers.sort_dependencies(app_list, allow_cycles=True))}
+    return sorted(paths, key=lambda path: order.get(first_model(path), len(order)))
+
+
+class Loader:
+
+    """Insert deserialized objects with one transaction per batch.
+
+    Foreign keys of a batch are checked with one query per relation and
+    objects are inserted raw, keeping the timestamps of the fixture. Reservation
+    codes and occupancy are kept up to date by the `api.signals` bulk create
+    receivers, `pre_save`/`post_save` are not sent.
+
+    Unlike `loaddata`, objects are only inserted: a primary key already in
+    the database raises `IntegrityError` instead of updating the row.
+    """
+
+    def __init__(self, batch_size=5000, using=DEFAULT_DB_ALIAS, progress=None):
+        self.batch_size = batch_size
+        self.using = using
+        self.progress = progress
+        self.counts = {}
+        self.start = time.perf_counter()
+
+    def load(self, path):
+        batch = []
+        try:
+            for deserialized in Deserializer(iter_objects(path), using=self.using):
+                obj = deserialized.object
+                if batch and (type(obj) is not type(batch[0].object) or len(batch) >= self.batch_size):
+                    self.flush(batch)
+                    batch = []
+                batch.append(deserialized)
+            if batch:
+                self.flush(batch)
+        except (DeserializationError, FixtureError) as e:
+            raise FixtureError('{}: {}'.format(path, e))
+
+    def flush(self, batch):
+        model = type(batch[0].object)
+        instances = [deserialized.object for deserialized in batch]
+        with transaction.atomic(using=self.using):
+            self.check_foreign_keys(model, instances)
+            signals.pre_bulk_create.send(sender=model, instances=instances)
+            self.insert(model, instances)
+            for deserialized in batch:
+                for name, values in (deserialized.m2m_data or {}).items():
+                    getattr(deserialized.object, name).set(values)
+            signals.post_bulk_create.send(sender=model, instances=instances)
+
+        # With DEBUG on every query is logged, do not let batches pile up.
+        reset_queries()
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + len(instances)
+        if self.progress:
+            total = sum(self.counts.values())
+            self.progress('{}: {:,} objects, {:,} in total ({:,.0f} objects/s)'.format(
+                label, self.counts[label], total, total / (time.perf_counter() - self.start)))
+
+    def check_foreign_keys(self, model, instances):
+        for field in model._meta.concrete_fields:
+            if not field.many_to_one and not field.one_to_one:
+                continue
+            related_model = field.related_model
+            values = {getattr(instance, field.attname) for instance in instances} - {None}
+            if related_model is model:
+                values -= {instance.pk for instance in instances}
+            if not values:
+                continue
+            existing = set(
+                related_model._base_manager.using(self.using)
+                .filter(pk__in=values).values_list('pk', flat=True)
+            )
+            for instance in instances:
+                value = getattr(instance, field.attname)
+                if value in values and value not in existing:
+                    raise FixtureError('{} {} refers to a missing {} {}.'.format(
+                        model._meta.label, instance.pk, field.name, value))
+
+    def insert(self, model, instances):
+        fields = model._meta.concrete_fields
+        for instance in instances:
+            for field in fields:
+                # Fill timestamps the fixture left out, others are kept.
+                if (getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)) \
+                        and getattr(instance, field.attname) is None:
+                    field.pre_save(instance, True)
+        if instances[0].pk is None:
+            fields = [field for field in fields if not field.primary_key]
+        ops = connections[self.using].ops
+        size = max(ops.bulk_batch_size(fields, instances), 1)
+        for start in range(0, len(instances), size):
+            raw_insert(model, instances[start:start + size], fields, self.using)
+
+
+def raw_insert(model, instances, fields, using):
+    """Insert `instances` with the values of `fields` as they are.
+
+    `bulk_create` sets `auto_now`/`auto_now_add` fields to the current time,
+    losing the timestamps of the fixture. Raw inserts keep them but are only
+    reachable through the private `QuerySet._insert(objs, fields, ...,
+    raw=False, using=None, ...)`. Checked against Django 4.1, the version in
+    constraints.txt; `FixtureLoaderTests.test_raw_insert` fails if it changes.
+    """
+    model._base_manager._insert(instances, fields=fields, using=using, raw=True)
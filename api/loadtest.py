@@ -0,0 +1,257 @@
+"""Synthetic dataset and scenarios for `manage.py benchmark_api`.
+
+Seeded objects look like the ones in `fixtures/` and are told apart from
+real ones by their property code prefix, so they can be cleared without
+touching anything else. Seeding uses `bulk_create` and keeps occupancy up
+to date, but does not record changes nor warm caches.
+"""
+
+import datetime
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.db import connection, reset_queries, transaction
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from listings.models import Listing
+from properties.models import Property
+from reservations import codes, occupancy
+from reports.models import DailyRollup
+from reservations.models import Occupancy, Reservation
+
+CODE_PREFIX = 'BENCH-'
+PLATFORMS = (('Airbnb', Decimal('5.00')), ('Booking', Decimal('8.00')), ('Vrbo', Decimal('6.50')))
+FIRST_CHECK_IN = datetime.date(2020, 1, 1)
+BATCH_SIZE = 5000
+
+
+def benchmark_properties():
+    return Property.objects.filter(code__startswith=CODE_PREFIX)
+
+
+def clear():
+    """Delete the seeded properties with their listings, reservations and rollups.
+
+    Rows are deleted without loading them nor sending signals, which would
+    take hours on large datasets.
+    """
+    properties = benchmark_properties()
+    listings = Listing.objects.filter(property__in=properties)
+    with transaction.atomic():
+        for queryset in (
+            Reservation.objects.filter(listing__in=listings),
+            Occupancy.objects.filter(property__in=properties),
+            DailyRollup.objects.filter(property__in=properties),
+            listings,
+            properties,
+        ):
+            queryset._raw_delete(queryset.db)
+
+
+def seed(properties, listings_per_property, reservations_per_listing, seed=0, log=None):
+    """Create `properties` properties with their listings and reservations.
+
+    Reservations of a listing follow each other without overlapping, from
+    `FIRST_CHECK_IN` on. Rows are inserted in batches of `BATCH_SIZE`.
+    """
+    rng = random.Random(seed)
+    start = benchmark_properties().count()
+    step = max(1, BATCH_SIZE // max(1, listings_per_property * max(1, reservations_per_listing)))
+    for first in range(start, start + properties, step):
+        last = min(first + step, start + properties)
+        with transaction.atomic():
+            seed_batch(rng, range(first, last), listings_per_property, reservations_per_listing)
+        if log:
+            log('Seeded {:,} of {:,} properties.'.format(last - start, properties))
+
+
+def seed_batch(rng, numbers, listings_per_property, reservations_per_listing):
+    property_batch = Property.objects.bulk_create([
+        Property(
+            code='{}{}'.format(CODE_PREFIX, number),
+            guest_limit=rng.randint(1, 10),
+            bathrooms=rng.randint(1, 4),
+            accept_pets=rng.random() < 0.5,
+            cleaning_price=Decimal(rng.choice((10, 15, 20, 30))),
+            activation_date=FIRST_CHECK_IN,
+        )
+        for number in numbers
+    ])
+    listing_batch = []
+    for property in property_batch:
+        for _ in range(listings_per_property):
+            platform, fee = rng.choice(PLATFORMS)
+            listing_batch.append(Listing(platform=platform, platform_fee=fee, property=property))
+    Listing.objects.bulk_create(listing_batch, batch_size=BATCH_SIZE)
+
+    reservations = []
+    for listing in listing_batch:
+        check_in = FIRST_CHECK_IN + datetime.timedelta(days=rng.randint(0, 30))
+        for _ in range(reservations_per_listing):
+            check_out = check_in + datetime.timedelta(days=rng.randint(1, 7))
+            reservations.append(Reservation(
+                listing=listing,
+                check_in=check_in,
+                check_out=check_out,
+                price=Decimal(rng.randint(40, 400)),
+                total_guests=rng.randint(1, listing.property.guest_limit),
+            ))
+            check_in = check_out + datetime.timedelta(days=rng.randint(0, 5))
+        if len(reservations) >= BATCH_SIZE:
+            create_reservations(reservations)
+            reservations = []
+    create_reservations(reservations)
+
+
+def create_reservations(reservations):
+    for reservation, code in zip(reservations, codes.allocate(len(reservations))):
+        reservation.code = code
+    Reservation.objects.bulk_create(reservations, batch_size=BATCH_SIZE)
+    occupancy.mark_many(
+        (reservation.listing.property_id, reservation.check_in, reservation.check_out)
+        for reservation in reservations
+    )
+
+
+class Samples:
+
+    """Ids of seeded objects requests are made with, picked at random."""
+
+    def __init__(self, rng, size=1000):
+        self.rng = rng
+        properties = benchmark_properties()
+        self.properties = list(properties.values_list('pk', flat=True)[:size])
+        listings = Listing.objects.filter(property__in=properties)
+        self.listings = list(listings.values_list('pk', flat=True)[:size])
+        reservations = Reservation.objects.filter(listing__in=self.listings)
+        self.reservations = list(reservations.values_list('pk', 'code')[:size])
+        if not (self.properties and self.listings and self.reservations):
+            raise ValueError('No benchmark data, seed it first.')
+
+    def property(self):
+        return self.rng.choice(self.properties)
+
+    def listing(self):
+        return self.rng.choice(self.listings)
+
+    def reservation(self):
+        return self.rng.choice(self.reservations)
+
+
+def scenarios(samples):
+    """Return `(name, make_request)` for each benchmarked endpoint.
+
+    `make_request` returns the `(method, path, params)` of one request.
+    """
+    def get(name, url_name, params=None, **kwargs):
+        def make_request():
+            return (
+                'get',
+                reverse(url_name, kwargs={key: value() for key, value in kwargs.items()}),
+                params() if callable(params) else params or {},
+            )
+        return name, make_request
+
+    # After every stay of the listing, so created stays never overlap.
+    listing = samples.listings[0]
+    last_check_out = Reservation.objects.filter(listing=listing).aggregate(Max('check_out'))
+    first_check_in = max(FIRST_CHECK_IN, last_check_out['check_out__max'] or FIRST_CHECK_IN)
+    created = iter(range(10 ** 9))
+
+    def create_reservation():
+        check_in = first_check_in + datetime.timedelta(days=next(created))
+        return ('post', reverse('api:v1:reservations:reservation-list'), {
+            'check_in': str(check_in),
+            'check_out': str(check_in + datetime.timedelta(days=1)),
+            'price': '100.00',
+            'total_guests': 1,
+            'listing': str(listing),
+        })
+
+    return [
+        get('properties-list', 'api:v1:properties:property-list'),
+        get('properties-detail', 'api:v1:properties:property-detail', pk=samples.property),
+        get('properties-availability', 'api:v1:properties:property-availability',
+            {'from': '2020-01-01', 'to': '2020-12-31'}, pk=samples.property),
+        get('listings-list', 'api:v1:listings:listing-list'),
+        get('listings-list-platform', 'api:v1:listings:listing-list', {'platform': 'Booking'}),
+        get('listings-detail', 'api:v1:listings:listing-detail', pk=samples.listing),
+        get('reservations-list', 'api:v1:reservations:reservation-list'),
+        get('reservations-list-property', 'api:v1:reservations:reservation-list',
+            lambda: {'property': samples.property(), 'check_in_after': '2020-03-01'}),
+        get('reservations-list-fields', 'api:v1:reservations:reservation-list',
+            {'fields': 'id,code,check_in,check_out', 'expand': ''}),
+        get('reservations-detail', 'api:v1:reservations:reservation-detail',
+            pk=lambda: samples.reservation()[0]),
+        get('reservations-by-code', 'api:v1:reservations:reservation-by-code',
+            code=lambda: samples.reservation()[1]),
+        get('reservations-export-property', 'api:v1:reservations:reservation-export',
+            lambda: {'property': samples.property()}),
+        get('changes', 'api:v1:changes:change-list'),
+        get('reports-property-month', 'api:v1:reports:report',
+            {'group_by': 'property,month', 'from': '2020-01-01', 'to': '2021-01-01'}),
+        get('reports-rollup', 'api:v1:reports:report',
+            {'group_by': 'platform,month', 'rollup': 'true'}),
+        ('reservations-create', create_reservation),
+    ]
+
+
+def send(client, method, path, params):
+    if method == 'get':
+        response = client.get(path, params)
+    else:
+        response = client.generic(method.upper(), path, json.dumps(params), 'application/json')
+    if response.streaming:
+        b''.join(response.streaming_content)
+    if response.status_code >= 400:
+        raise AssertionError('{} {} returned {}: {}'.format(
+            method.upper(), path, response.status_code, response.content[:200]))
+    return response
+
+
+def run(name, make_request, requests):
+    """Measure a scenario.
+
+    The first request is instrumented to count queries and the memory
+    allocated at peak; the next `requests` are timed without instrumentation.
+    """
+    client = Client()
+
+    # The query log is capped, start from an empty one so counts are right.
+    reset_queries()
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as context:
+        send(client, *make_request())
+    queries = len(context.captured_queries)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies = []
+    for _ in range(requests):
+        request = make_request()
+        start = time.perf_counter()
+        send(client, *request)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'name': name,
+        'requests': requests,
+        'throughput': len(latencies) / sum(latencies),
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'queries': queries,
+        'peak_memory_kb': peak_memory / 1024,
+    }
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))
+    return values[index]
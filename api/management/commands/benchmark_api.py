@@ -0,0 +1,91 @@
+import json
+import random
+import resource
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import loadtest
+from reports import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic dataset and measure throughput, p50/p99 latency, queries and peak '
+        'memory of each v1 endpoint. Compare with a previous run with --baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Add benchmark data before running.')
+        parser.add_argument('--clear', action='store_true', help='Delete benchmark data and exit.')
+        parser.add_argument('--properties', type=int, default=100)
+        parser.add_argument('--listings-per-property', type=int, default=10)
+        parser.add_argument('--reservations-per-listing', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=100, help='Timed requests per endpoint.')
+        parser.add_argument('--scenario', action='append', help='Only run these scenarios (repeatable).')
+        parser.add_argument('--random-seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Fail on regressions against this JSON file.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Throughput drop allowed against the baseline (0.2 = 20%%).')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            loadtest.clear()
+            self.stdout.write(self.style.SUCCESS('Benchmark data deleted.'))
+            return
+        if options['seed']:
+            loadtest.seed(
+                options['properties'],
+                options['listings_per_property'],
+                options['reservations_per_listing'],
+                seed=options['random_seed'],
+                log=self.stdout.write,
+            )
+            rollups.refresh()
+
+        try:
+            samples = loadtest.Samples(random.Random(options['random_seed']))
+        except ValueError as e:
+            raise CommandError('{} Run with --seed.'.format(e))
+
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING('DEBUG is on, queries are logged and timings are higher.'))
+        results = []
+        self.stdout.write('{:<30} {:>10} {:>9} {:>9} {:>8} {:>11}'.format(
+            'scenario', 'req/sec', 'p50 ms', 'p99 ms', 'queries', 'peak KiB'))
+        for name, make_request in loadtest.scenarios(samples):
+            if options['scenario'] and name not in options['scenario']:
+                continue
+            result = loadtest.run(name, make_request, options['requests'])
+            results.append(result)
+            self.stdout.write('{name:<30} {throughput:>10,.0f} {p50_ms:>9.2f} {p99_ms:>9.2f} '
+                              '{queries:>8} {peak_memory_kb:>11,.0f}'.format(**result))
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write('Max RSS: {:,} KiB'.format(max_rss))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'max_rss_kb': max_rss, 'results': results}, f, indent=2)
+
+        if options['baseline']:
+            self.check_baseline(results, options['baseline'], options['tolerance'])
+
+    def check_baseline(self, results, path, tolerance):
+        with open(path) as f:
+            baseline = {result['name']: result for result in json.load(f)['results']}
+        regressions = []
+        for result in results:
+            previous = baseline.get(result['name'])
+            if previous is None:
+                continue
+            if result['throughput'] < previous['throughput'] * (1 - tolerance):
+                regressions.append('{}: {:,.0f} req/sec, was {:,.0f}'.format(
+                    result['name'], result['throughput'], previous['throughput']))
+            if result['queries'] > previous['queries']:
+                regressions.append('{}: {} queries, was {}'.format(
+                    result['name'], result['queries'], previous['queries']))
+        if regressions:
+            raise CommandError('Regressions against {}:\n{}'.format(path, '\n'.join(regressions)))
+        self.stdout.write(self.style.SUCCESS('No regression against {}.'.format(path)))
@@ -0,0 +1,126 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test.client import RequestFactory
+from django.urls import reverse
+
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare property reads served by WSGI with a thread pool, by ASGI through the '
+        'sync DRF view and by ASGI through the async view (requests/sec and p99 latency).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help='Concurrent clients.')
+        parser.add_argument('--requests', type=int, default=5, help='Requests sent by each client.')
+        parser.add_argument('--threads', type=int, default=32, help='Threads of the WSGI server.')
+        parser.add_argument(
+            '--client-delay', type=float, default=0.05,
+            help='Seconds a slow client takes to receive each response.')
+        parser.add_argument('--page-size', type=int, default=10)
+
+    def handle(self, *args, **options):
+        created = self.create_properties(options['page_size'])
+        try:
+            query = 'page_size={}'.format(options['page_size'])
+            sync_path = reverse('api:v1:properties:property-list')
+            async_path = reverse('api:v1:properties:property-async-list')
+            for name, latencies, elapsed in (
+                ('wsgi', *self.run_wsgi(sync_path, query, options)),
+                ('asgi-sync', *self.run_asgi(sync_path, query, options)),
+                ('asgi-async', *self.run_asgi(async_path, query, options)),
+            ):
+                self.stdout.write('{:<11} {:>8,.0f} req/sec  p50 {:>7.1f} ms  p99 {:>7.1f} ms'.format(
+                    name,
+                    len(latencies) / elapsed,
+                    statistics.median(latencies) * 1000,
+                    statistics.quantiles(latencies, n=100)[98] * 1000,
+                ))
+        finally:
+            Property.objects.filter(pk__in=created).delete()
+
+    def create_properties(self, count):
+        return [
+            Property.objects.create(
+                code='benchmark-{}-{}'.format(time.time_ns(), index),
+                guest_limit=4, bathrooms=1, accept_pets=False, cleaning_price=20,
+            ).pk
+            for index in range(count)
+        ]
+
+    def run_wsgi(self, path, query, options):
+        """Each request holds one of `threads` workers until the client received it."""
+        handler = WSGIHandler()
+        factory = RequestFactory()
+
+        def request(queued_at):
+            environ = factory._base_environ(PATH_INFO=path, QUERY_STRING=query)
+            response = handler(environ, lambda status, headers: None)
+            try:
+                for _ in response:
+                    time.sleep(options['client_delay'])
+                assert response.status_code == 200, response.status_code
+            finally:
+                response.close()
+            return time.perf_counter() - queued_at
+
+        total = options['clients'] * options['requests']
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['threads']) as pool:
+            futures = [pool.submit(request, time.perf_counter()) for _ in range(total)]
+            latencies = [future.result() for future in futures]
+        return latencies, time.perf_counter() - start
+
+    def run_asgi(self, path, query, options):
+        """Every client is a coroutine, slow clients only wait on the event loop."""
+        handler = ASGIHandler()
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 0),
+            'server': ('testserver', 80),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def request():
+            start = time.perf_counter()
+            statuses = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                    await asyncio.sleep(options['client_delay'])
+
+            await handler(dict(scope), receive, send)
+            assert statuses == [200], statuses
+            return time.perf_counter() - start
+
+        async def client():
+            return [await request() for _ in range(options['requests'])]
+
+        async def main():
+            results = await asyncio.gather(*(client() for _ in range(options['clients'])))
+            return [latency for latencies in results for latency in latencies]
+
+        start = time.perf_counter()
+        latencies = asyncio.run(main())
+        return latencies, time.perf_counter() - start
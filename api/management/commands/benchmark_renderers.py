@@ -0,0 +1,53 @@
+import gzip
+import json
+import time
+
+import msgpack
+from rest_framework.renderers import JSONRenderer
+
+from django.core.management.base import BaseCommand
+
+from api.renderers import FastJSONRenderer, MessagePackRenderer, get_json_backend
+from reservations.api_v1.serializers import ReservationReadSerializer
+
+from .benchmark_serializers import Command as SerializersCommand
+
+RENDERERS = (
+    ('json', JSONRenderer, json.loads),
+    ('fast json', FastJSONRenderer, json.loads),
+    ('msgpack', MessagePackRenderer, msgpack.unpackb),
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare encode time and payload size of the response renderers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Reservations in the rendered page.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        reservations = SerializersCommand().build_reservations(options['rows'])
+        data = {
+            'next': 'http://testserver/api/v1/reservations/?cursor=cD0yMDIzLTAxLTAx',
+            'previous': None,
+            'results': ReservationReadSerializer(reservations, many=True).data,
+        }
+        expected = json.loads(json.dumps(data, default=str))
+
+        self.stdout.write('{:<20} {:>12} {:>12} {:>12}'.format('renderer', 'encode ms', 'bytes', 'gzip bytes'))
+        for name, renderer_class, decode in RENDERERS:
+            renderer = renderer_class()
+            content = renderer.render(data)
+            if renderer_class is FastJSONRenderer:
+                name = '{} ({})'.format(name, get_json_backend())
+            if decode(content) != expected:
+                raise AssertionError('{} output does not decode to the rendered data.'.format(name))
+            best = min(self.measure(renderer, data) for _ in range(options['repeat']))
+            self.stdout.write('{:<20} {:>12.2f} {:>12,} {:>12,}'.format(
+                name, best * 1000, len(content), len(gzip.compress(content))))
+
+    def measure(self, renderer, data):
+        start = time.perf_counter()
+        renderer.render(data)
+        return time.perf_counter() - start
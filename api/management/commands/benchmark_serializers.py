@@ -0,0 +1,106 @@
+import datetime
+import time
+import uuid
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from listings.models import Listing
+from properties.models import Property
+from reservations.api_v1.serializers import ReservationReadSerializer
+from reservations.models import Reservation
+
+
+class BaselinePropertySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Property
+        fields = '__all__'
+
+
+class BaselineListingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Listing
+        fields = '__all__'
+
+    def to_representation(self, instance):
+        return BaselineListingReadSerializer().to_representation(instance)
+
+
+class BaselineListingReadSerializer(serializers.ModelSerializer):
+    property = BaselinePropertySerializer(read_only=True)
+
+    class Meta:
+        model = Listing
+        fields = '__all__'
+
+
+class BaselineReservationReadSerializer(serializers.ModelSerializer):
+
+    """Reservation read serializer as it was before the fast path.
+
+    Stock DRF representation with a new listing serializer per row.
+    """
+
+    listing = BaselineListingSerializer(read_only=True)
+
+    class Meta:
+        model = Reservation
+        fields = '__all__'
+
+
+class Command(BaseCommand):
+    help = 'Measure reservation read serialization throughput (rows/sec).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        reservations = self.build_reservations(options['rows'])
+
+        baseline = BaselineReservationReadSerializer(reservations, many=True).data
+        fast = ReservationReadSerializer(reservations, many=True).data
+        if baseline != fast:
+            raise AssertionError('Fast path output differs from the baseline output.')
+
+        for name, serializer_class in (
+            ('baseline', BaselineReservationReadSerializer),
+            ('fast', ReservationReadSerializer),
+        ):
+            best = min(
+                self.measure(serializer_class, reservations)
+                for _ in range(options['repeat'])
+            )
+            self.stdout.write('{:<10} {:>12,.0f} rows/sec'.format(name, len(reservations) / best))
+
+    def measure(self, serializer_class, reservations):
+        start = time.perf_counter()
+        serializer_class(reservations, many=True).data
+        return time.perf_counter() - start
+
+    def build_reservations(self, rows):
+        """Build unsaved instances so the benchmark does not touch the database."""
+        now = timezone.now()
+        property = Property(
+            code='benchmark', guest_limit=4, bathrooms=1, accept_pets=False,
+            cleaning_price=Decimal('20.00'), created_at=now, updated_at=now)
+        listing = Listing(
+            platform='Airbnb', platform_fee=Decimal('5.00'), property=property,
+            created_at=now, updated_at=now)
+        check_in = datetime.date(2023, 1, 1)
+        return [
+            Reservation(
+                code=uuid.uuid4().hex[:6].upper(),
+                check_in=check_in,
+                check_out=check_in + datetime.timedelta(days=2),
+                price=Decimal('150.00'),
+                total_guests=2,
+                listing=listing,
+                created_at=now,
+                updated_at=now,
+            )
+            for _ in range(rows)
+        ]
@@ -0,0 +1,71 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+# Run in a fresh interpreter for each settings module so imports are measured.
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+import django
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns
+startup = time.perf_counter() - start
+modules = len(sys.modules)
+
+from django.test import Client
+client = Client()
+path, requests = sys.argv[1], int(sys.argv[2])
+for _ in range(50):
+    client.get(path)
+timings = []
+for _ in range(requests):
+    start = time.perf_counter()
+    response = client.get(path)
+    timings.append(time.perf_counter() - start)
+assert response.status_code == 200, response.status_code
+print(json.dumps({'startup': startup, 'modules': modules, 'timings': timings}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Compare startup time and per-request overhead of settings modules.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'settings_modules', nargs='*', default=['khanto.settings', 'khanto.settings_api'])
+        parser.add_argument(
+            '--path', default='/api/v1/cache/stats/',
+            help='Endpoint requested, a cheap one so the middleware stack dominates.')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--runs', type=int, default=5, help='Interpreters started per module.')
+
+    def handle(self, *args, **options):
+        self.stdout.write('{:<24} {:>12} {:>9} {:>14}'.format(
+            'settings', 'startup ms', 'modules', 'request us'))
+        for module in options['settings_modules']:
+            startups, requests, modules = [], [], 0
+            for _ in range(options['runs']):
+                result = self.run_child(module, options['path'], options['requests'])
+                startups.append(result['startup'])
+                requests.append(statistics.median(result['timings']))
+                modules = result['modules']
+            self.stdout.write('{:<24} {:>12.1f} {:>9} {:>14.1f}'.format(
+                module,
+                statistics.median(startups) * 1000,
+                modules,
+                statistics.median(requests) * 1000000,
+            ))
+
+    def run_child(self, module, path, requests):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=module, API_SLOW_REQUEST_SECONDS='60')
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, path, str(requests)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        return json.loads(output)
@@ -0,0 +1,76 @@
+import datetime
+import threading
+import time
+from collections import Counter
+
+from rest_framework.test import APIClient
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, connections
+from django.urls import reverse
+
+from listings.models import Listing
+from properties.models import Property
+from reservations.models import Reservation
+
+
+class Command(BaseCommand):
+    help = 'Create reservations through the API from concurrent threads and report writes/sec.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=100, help='Reservations created by each thread.')
+        parser.add_argument('--keep', action='store_true', help='Keep the rows created by the benchmark.')
+
+    def handle(self, *args, **options):
+        property = Property.objects.create(
+            code='benchmark-{}'.format(int(time.time() * 1000)),
+            guest_limit=4, bathrooms=1, accept_pets=False, cleaning_price=20)
+        # One listing per thread so reservations never overlap each other.
+        listings = [
+            Listing.objects.create(platform='Benchmark', platform_fee=5, property=property)
+            for _ in range(options['threads'])
+        ]
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def write(listing):
+            client = APIClient()
+            url = reverse('api:v1:reservations:reservation-list')
+            check_in = datetime.date(2000, 1, 1)
+            try:
+                for _ in range(options['writes']):
+                    try:
+                        status = client.post(url, {
+                            'check_in': check_in,
+                            'check_out': check_in + datetime.timedelta(days=1),
+                            'price': '100.00',
+                            'total_guests': 2,
+                            'listing': str(listing.pk),
+                        }, format='json').status_code
+                    except DatabaseError as e:
+                        status = '{}: {}'.format(type(e).__name__, e)
+                    check_in += datetime.timedelta(days=1)
+                    with lock:
+                        statuses[status] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=write, args=(listing,)) for listing in listings]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        total = sum(statuses.values())
+        self.stdout.write('{} {}: {:,.0f} writes/sec, {} requests in {:.2f}s'.format(
+            connection.vendor, options['threads'], statuses[201] / elapsed, total, elapsed))
+        for status, count in sorted(statuses.items(), key=str):
+            self.stdout.write('  {}: {}'.format(status, count))
+
+        if not options['keep']:
+            Reservation.objects.filter(listing__in=listings).delete()
+            property.delete()
+            Listing.objects.filter(pk__in=[listing.pk for listing in listings]).delete()
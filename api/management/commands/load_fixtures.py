@@ -0,0 +1,54 @@
+import glob
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from api import fixtures
+
+
+class Command(BaseCommand):
+    help = (
+        'Load large JSON or NDJSON fixtures (optionally gzipped) in batches. Much faster than '
+        'loaddata, memory use does not depend on file size. pre_save/post_save are not sent. '
+        'Objects are only inserted: unlike loaddata, existing primary keys raise IntegrityError '
+        'instead of being updated.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixtures', nargs='+', help='Fixture paths, globs or names in FIXTURES_DIR.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        paths = []
+        for name in options['fixtures']:
+            found = self.find(name)
+            if not found:
+                raise CommandError('No fixture named {!r}.'.format(name))
+            paths.extend(found)
+
+        loader = fixtures.Loader(
+            batch_size=options['batch_size'],
+            using=options['database'],
+            progress=self.stdout.write if options['verbosity'] else None,
+        )
+        try:
+            for path in fixtures.sort_paths(paths):
+                loader.load(path)
+        except fixtures.FixtureError as e:
+            raise CommandError(e)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS('Loaded {:,} objects from {} files.'.format(
+                sum(loader.counts.values()), len(paths))))
+
+    def find(self, name):
+        paths = sorted(glob.glob(name))
+        if paths:
+            return paths
+        for directory in getattr(settings, 'FIXTURES_DIR', []):
+            paths = sorted(glob.glob(os.path.join(directory, name)))
+            if paths:
+                return paths
+        return []
@@ -0,0 +1,138 @@
+"""Per-endpoint request metrics.
+
+`api.middleware.MetricsMiddleware` creates a `RequestTimings` for each
+request and stores it in a context variable. Database time is added by a
+wrapper installed on every connection and serialization time by the API
+serializers (`api.serializers.TimedRepresentationMixin`) and response
+rendering, so only requests going through the middleware are measured. Totals are kept per process and
+exposed in the Prometheus text format on `/metrics`.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from collections import defaultdict
+
+# Upper bounds of the request duration histogram, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# SQL statements kept per request for the slow request log.
+MAX_SAMPLED_QUERIES = 50
+
+current = contextvars.ContextVar('api_request_timings', default=None)
+
+
+class RequestTimings:
+
+    __slots__ = ('start', 'db_time', 'queries', 'serialization_time', 'serializing', 'sql')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.serialization_time = 0.0
+        self.serializing = False
+        self.sql = []
+
+
+def query_timer(execute, sql, params, many, context):
+    """Database execute wrapper adding the query time to the current request."""
+    timings = current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        timings.db_time += duration
+        timings.queries += 1
+        if len(timings.sql) < MAX_SAMPLED_QUERIES:
+            timings.sql.append((sql, duration))
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """`connection_created` receiver installing `query_timer` on new connections."""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+class Registry:
+
+    """Totals of the requests served by this process, per method and endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = defaultdict(lambda: {
+                'requests': 0,
+                'duration': 0.0,
+                'db_time': 0.0,
+                'queries': 0,
+                'serialization_time': 0.0,
+                'response_bytes': 0,
+                'buckets': [0] * (len(BUCKETS) + 1),
+            })
+
+    def observe(self, method, endpoint, duration, timings, response_bytes):
+        with self.lock:
+            totals = self.endpoints[method, endpoint]
+            totals['requests'] += 1
+            totals['duration'] += duration
+            totals['db_time'] += timings.db_time
+            totals['queries'] += timings.queries
+            totals['serialization_time'] += timings.serialization_time
+            totals['response_bytes'] += response_bytes
+            totals['buckets'][bisect.bisect_left(BUCKETS, duration)] += 1
+
+    def add_response_bytes(self, method, endpoint, response_bytes):
+        """Count the body of a streaming response once it has been sent."""
+        with self.lock:
+            self.endpoints[method, endpoint]['response_bytes'] += response_bytes
+
+    def render(self):
+        """Return the totals in the Prometheus text exposition format."""
+        with self.lock:
+            endpoints = sorted(
+                (key, dict(totals, buckets=list(totals['buckets'])))
+                for key, totals in self.endpoints.items()
+            )
+
+        lines = []
+
+        def metric(name, kind, help, field):
+            lines.append('# HELP {} {}'.format(name, help))
+            lines.append('# TYPE {} {}'.format(name, kind))
+            for (method, endpoint), totals in endpoints:
+                lines.append('{}{{{}}} {}'.format(name, labels(method, endpoint), totals[field]))
+
+        metric('khanto_requests_total', 'counter', 'Requests served.', 'requests')
+        metric('khanto_request_db_seconds_total', 'counter', 'Time spent in database queries.', 'db_time')
+        metric('khanto_request_queries_total', 'counter', 'Database queries executed.', 'queries')
+        metric('khanto_request_serialization_seconds_total', 'counter',
+               'Time spent serializing and rendering responses.', 'serialization_time')
+        metric('khanto_response_bytes_total', 'counter', 'Response body bytes.', 'response_bytes')
+
+        name = 'khanto_request_duration_seconds'
+        lines.append('# HELP {} Request duration.'.format(name))
+        lines.append('# TYPE {} histogram'.format(name))
+        for (method, endpoint), totals in endpoints:
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), totals['buckets']):
+                cumulative += count
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(
+                    name, labels(method, endpoint), bound, cumulative))
+            lines.append('{}_sum{{{}}} {}'.format(name, labels(method, endpoint), totals['duration']))
+            lines.append('{}_count{{{}}} {}'.format(name, labels(method, endpoint), totals['requests']))
+        return '\n'.join(lines) + '\n'
+
+
+def labels(method, endpoint):
+    endpoint = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+    return 'method="{}",endpoint="{}"'.format(method, endpoint)
+
+
+registry = Registry()
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence
+
+from . import cache, compression, metrics
+
+logger = logging.getLogger('api.slow_requests')
+
+
+class MetricsMiddleware:
+
+    """Measure requests, see `api.metrics`.
+
+    Adds a `Server-Timing` header with the time spent in the database and
+    serializing, and logs requests slower than `API_SLOW_REQUEST_SECONDS`
+    with their SQL to the `api.slow_requests` logger. Put it first in
+    `MIDDLEWARE` so the whole stack is measured. Removed from the stack when
+    `API_METRICS_ENABLED` is off.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.API_METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Same as Django's MiddlewareMixin, run async under ASGI.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            self._is_coroutine = None
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.__acall__(request)
+        timings = metrics.RequestTimings()
+        token = metrics.current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = metrics.RequestTimings()
+        token = metrics.current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, timings)
+
+    def process_template_response(self, request, response):
+        """Count rendering (e.g. JSON encoding of DRF responses) as serialization."""
+        timings = metrics.current.get()
+        if timings is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                timings.serialization_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, timings):
+        duration = time.perf_counter() - timings.start
+        endpoint = self.get_endpoint(request)
+        if response.streaming:
+            response_bytes = 0
+            response.streaming_content = self.count_bytes(
+                response.streaming_content, request.method, endpoint)
+        else:
+            response_bytes = len(response.content)
+        metrics.registry.observe(request.method, endpoint, duration, timings, response_bytes)
+
+        response['Server-Timing'] = (
+            'db;dur={:.2f};desc="{} queries", serialization;dur={:.2f}, total;dur={:.2f}'.format(
+                timings.db_time * 1000, timings.queries,
+                timings.serialization_time * 1000, duration * 1000,
+            )
+        )
+        if duration >= settings.API_SLOW_REQUEST_SECONDS:
+            self.log_slow_request(request, endpoint, duration, timings)
+        return response
+
+    def get_endpoint(self, request):
+        # Unresolved paths share one label so scans do not create series.
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match is not None else '<unresolved>'
+
+    def count_bytes(self, content, method, endpoint):
+        size = 0
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+        metrics.registry.add_response_bytes(method, endpoint, size)
+
+    def log_slow_request(self, request, endpoint, duration, timings):
+        lines = [
+            '{:.2f} ms {}'.format(query_duration * 1000, sql)
+            for sql, query_duration in timings.sql
+        ]
+        if timings.queries > len(timings.sql):
+            lines.append('... {} more queries'.format(timings.queries - len(timings.sql)))
+        logger.warning(
+            'Slow request %s %s (%s) took %.2f ms: %d queries in %.2f ms, %.2f ms serializing\n%s',
+            request.method, request.get_full_path(), endpoint, duration * 1000,
+            timings.queries, timings.db_time * 1000, timings.serialization_time * 1000,
+            '\n'.join(lines),
+        )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+
+    """Compress API v1 responses of `API_COMPRESSION_MIN_SIZE` bytes or more.
+
+    The encoding is negotiated with `Accept-Encoding` among the
+    `API_COMPRESSION_ENCODINGS` available (see `api.compression`). Compressed
+    bodies of responses with an ETag are kept in the API cache under the
+    absolute URL and the ETag, so hot responses are compressed once. ETags
+    change on any write, deletes included (see `api.mixins`), and the URL
+    keeps apart bodies whose links differ by host or scheme.
+    Streaming responses are compressed with gzip only, as they are sent.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.encodings = [
+            encoding for encoding in settings.API_COMPRESSION_ENCODINGS
+            if encoding in compression.CODECS
+        ]
+        if not self.encodings:
+            raise MiddlewareNotUsed()
+
+    def process_response(self, request, response):
+        match = getattr(request, 'resolver_match', None)
+        if match is None or not match.namespace.startswith('api:v1') or response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+        if response.streaming:
+            if 'gzip' in self.encodings and compression.negotiate(accept_encoding, ['gzip']):
+                del response['Content-Length']
+                response.streaming_content = compress_sequence(response.streaming_content)
+                self.set_encoding(response, 'gzip')
+            return response
+
+        if len(response.content) < settings.API_COMPRESSION_MIN_SIZE:
+            return response
+        encoding = compression.negotiate(accept_encoding, self.encodings)
+        if encoding is None:
+            return response
+
+        content = self.compress(request, response, encoding)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        self.set_encoding(response, encoding)
+        return response
+
+    def compress(self, request, response, encoding):
+        etag = response.get('ETag')
+        if etag is None:
+            return compression.CODECS[encoding](response.content)
+        key = 'api:compressed:' + hashlib.sha256(
+            '|'.join((request.build_absolute_uri(), etag, encoding)).encode()).hexdigest()
+        content = cache.get_cache().get(key)
+        if content is None:
+            content = compression.CODECS[encoding](response.content)
+            cache.get_cache().set(key, content)
+        return content
+
+    def set_encoding(self, response, encoding):
+        response['Content-Encoding'] = encoding
+        # The representation changed, only weak comparison still holds.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
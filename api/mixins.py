@@ -0,0 +1,155 @@
+import hashlib
+
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from changes.models import Change
+
+from .parsers import MessagePackParser, NDJSONParser
+from .serializers import DynamicFieldsMixin, is_expanded
+
+
+class BulkCreateModelMixin:
+
+    """Create many objects with a single `POST <collection>/bulk/`.
+
+    The body is a JSON array, NDJSON (one object per line) or a MessagePack
+    array. Items are validated together and inserted in one transaction:
+    when any item is invalid nothing is created and the errors are returned
+    per item.
+    The serializer must use `api.serializers.BulkListSerializer`.
+    """
+
+    bulk_result_fields = ('id',)
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser, MessagePackParser])
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            instances = serializer.save()
+        return Response([
+            {field: getattr(instance, field) for field in self.bulk_result_fields}
+            for instance in instances
+        ], status=status.HTTP_201_CREATED)
+
+
+class DynamicFieldsViewMixin:
+
+    """Support `?fields=` and `?expand=` on views using `DynamicFieldsMixin` serializers.
+
+    Both take comma separated dotted paths, e.g. `?fields=id,listing.platform&expand=listing`,
+    and only apply to safe methods. `expandable_relations` lists the
+    relations nested by default, only the ones actually returned are joined.
+    """
+
+    expandable_relations = ()
+
+    def get_field_paths(self, name):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        value = request.query_params.get(name)
+        if value is None:
+            return None
+        return {path.strip() for path in value.split(',') if path.strip()}
+
+    def get_serializer(self, *args, **kwargs):
+        if issubclass(self.get_serializer_class(), DynamicFieldsMixin):
+            kwargs.setdefault('fields', self.get_field_paths('fields'))
+            kwargs.setdefault('expand', self.get_field_paths('expand'))
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_field_paths('fields')
+        expand = self.get_field_paths('expand')
+        if fields is None and expand is None:
+            return queryset
+        related = [
+            path.replace('.', '__') for path in self.expandable_relations
+            if is_expanded(path, fields, expand)
+        ]
+        queryset = queryset.select_related(None)
+        return queryset.select_related(*related) if related else queryset
+
+
+class ConditionalRequestMixin:
+
+    """Answer `list` and `retrieve` with 304 Not Modified when nothing changed.
+
+    Detail validators are derived from the `updated_at` of the object and
+    its joined relations. Collections use the last id of the change feed,
+    which grows on every insert, update and delete, including deletes of
+    related rows (`SET_NULL`) that leave no trace in the remaining rows.
+    They are checked before serializing anything. The query string and the
+    media type are part of the ETag since they change the representation.
+    Detail views also send `Last-Modified`, the latest of those `updated_at`.
+    Collections do not: timestamps do not see deletes.
+    """
+
+    def get_related_paths(self, queryset):
+        """Return the relations joined with `select_related`, as ORM paths."""
+        paths = []
+
+        def walk(related, prefix):
+            for name, children in related.items():
+                paths.append(prefix + name)
+                walk(children, prefix + name + '__')
+
+        if isinstance(queryset.query.select_related, dict):
+            walk(queryset.query.select_related, '')
+        return paths
+
+    def get_etag(self, parts):
+        request = self.request
+        parts = [request.accepted_media_type, request.META.get('QUERY_STRING', '')] + parts
+        return quote_etag(hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()[:32])
+
+    def get_conditional_response(self, parts, last_modified=None):
+        etag = self.get_etag(parts)
+        headers = {'ETag': etag}
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+            headers['Last-Modified'] = http_date(last_modified)
+        response = get_conditional_response(
+            self.request._request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return Response(status=response.status_code, headers=headers), headers
+        return None, headers
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        not_modified, headers = self.get_conditional_response(
+            [queryset.model._meta.label, Change.last_id()])
+        if not_modified is not None:
+            return not_modified
+        response = super().list(request, *args, **kwargs)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        timestamps = [instance.updated_at]
+        for path in self.get_related_paths(self.get_queryset()):
+            related = instance
+            for name in path.split('__'):
+                related = getattr(related, name) if related is not None else None
+            timestamps.append(related.updated_at if related is not None else None)
+
+        not_modified, headers = self.get_conditional_response(
+            [instance.pk] + [timestamp and timestamp.isoformat() for timestamp in timestamps],
+            max(timestamp for timestamp in timestamps if timestamp is not None),
+        )
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers=headers)
@@ -0,0 +1,46 @@
+import json
+
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from django.conf import settings
+
+
+class NDJSONParser(BaseParser):
+
+    """Parse newline delimited JSON into a list, one item per line."""
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        items = []
+        if stream is None:
+            return items
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line.decode(encoding)))
+            except ValueError as exc:
+                raise ParseError('NDJSON parse error on line {} - {}'.format(number, exc))
+        return items
+
+
+class MessagePackParser(BaseParser):
+
+    """Parse a MessagePack body, see `api.renderers.MessagePackRenderer`."""
+
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return None
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - {}'.format(exc))
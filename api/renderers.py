@@ -0,0 +1,106 @@
+import json
+
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+encode_default = JSONEncoder().default
+
+
+def get_json_backend():
+    backend = settings.API_JSON_BACKEND
+    if backend == 'auto':
+        return 'json' if orjson is None else 'orjson'
+    if backend == 'orjson' and orjson is None:
+        raise ImproperlyConfigured('API_JSON_BACKEND is "orjson" but orjson is not installed.')
+    return backend
+
+
+def dumps(data):
+    """Encode `data` to compact UTF-8 JSON like DRF's `JSONRenderer` does.
+
+    With orjson, values it does not encode the way DRF does go through DRF's
+    encoder: decimals, dates and datetimes (DRF truncates microseconds)...
+    Data orjson refuses, e.g. non-string keys, is encoded by the standard
+    library. Only floats in exponent notation are written differently.
+    """
+    if get_json_backend() == 'orjson':
+        try:
+            content = orjson.dumps(data, default=encode_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            pass
+        else:
+            # DRF escapes the JavaScript line terminators.
+            if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+                content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+            return content
+    content = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    """`JSONRenderer` encoding with orjson when it is installed.
+
+    orjson writes bytes directly and is several times faster than the
+    standard library. The output is the same, see `dumps`. Indented output
+    (e.g. for the browsable API) is left to DRF. `API_JSON_BACKEND` forces
+    'orjson' or 'json' instead of picking one.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class NDJSONRenderer(FastJSONRenderer):
+
+    """Renderer for newline delimited JSON.
+
+    Streaming responses write their own lines (see `api.streaming`), this
+    renderer is only used for regular responses, e.g. errors, which are
+    rendered as a single line.
+    """
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return super().render(data, accepted_media_type, renderer_context) + b'\n'
+
+
+class MessagePackRenderer(BaseRenderer):
+
+    """Render MessagePack, a binary encoding of the same data as JSON.
+
+    Serializers return decimals, UUIDs and datetimes as strings already,
+    other values msgpack has no type for are converted like DRF's JSON
+    encoder does so both formats always carry the same values. Strings are
+    used on purpose rather than extension types: they are exact for
+    decimals, every msgpack client reads them without extra hooks and
+    parsers accept them back as they are.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
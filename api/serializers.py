@@ -0,0 +1,286 @@
+import time
+from collections import OrderedDict
+from operator import attrgetter
+
+from rest_framework import relations, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SkipField
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.functional import cached_property
+
+from . import cache, metrics, signals
+
+
+class FastRepresentationMixin:
+
+    """Serialize instances using a representation plan built once.
+
+    `Serializer.to_representation` walks the readable fields and resolves
+    each field source for every instance. Here the list of readable fields is
+    resolved once per serializer and plain model fields are read with
+    `operator.attrgetter`. The output is the same as DRF's.
+    """
+
+    @cached_property
+    def _representation_plan(self):
+        plan = []
+        for field in self._readable_fields:
+            if self._is_plain_field(field):
+                get_attribute = attrgetter(field.source_attrs[0])
+            else:
+                get_attribute = field.get_attribute
+            plan.append((field.field_name, get_attribute, field.to_representation))
+        return plan
+
+    @staticmethod
+    def _is_plain_field(field):
+        return (
+            len(field.source_attrs) == 1
+            and not isinstance(field, (
+                relations.RelatedField,
+                relations.ManyRelatedField,
+                serializers.BaseSerializer,
+            ))
+        )
+
+    def to_representation(self, instance):
+        ret = OrderedDict()
+        for field_name, get_attribute, to_representation in self._representation_plan:
+            try:
+                attribute = get_attribute(instance)
+            except SkipField:
+                continue
+
+            if isinstance(attribute, relations.PKOnlyObject):
+                check_for_none = attribute.pk
+            else:
+                check_for_none = attribute
+            if check_for_none is None:
+                ret[field_name] = None
+            else:
+                ret[field_name] = to_representation(attribute)
+        return ret
+
+
+def top_level(paths):
+    return {path.split('.', 1)[0] for path in paths}
+
+
+def nested_fields(fields, name):
+    """Return the `fields` paths under `name`, None meaning every field."""
+    if fields is None:
+        return None
+    prefix = name + '.'
+    return {path[len(prefix):] for path in fields if path.startswith(prefix)} or None
+
+
+def nested_expand(expand, name):
+    """Return the `expand` paths under `name`, None meaning every relation."""
+    if expand is None:
+        return None
+    prefix = name + '.'
+    return {path[len(prefix):] for path in expand if path.startswith(prefix)}
+
+
+def is_expanded(path, fields, expand):
+    """Return whether the relation `path` is selected by `fields` and nested by `expand`."""
+    name, _, rest = path.partition('.')
+    if fields is not None and name not in top_level(fields):
+        return False
+    if expand is not None and name not in top_level(expand):
+        return False
+    return not rest or is_expanded(rest, nested_fields(fields, name), nested_expand(expand, name))
+
+
+class DynamicFieldsMixin:
+
+    """Let clients pick the fields and nested relations returned.
+
+    `fields` and `expand` are sets of dotted paths, e.g. `{'id', 'listing.platform'}`
+    and `{'listing'}`. Fields not in `fields` are left out. Relations in
+    `expandable_fields` are nested with the given serializer when in `expand`
+    and returned as ids otherwise. `None` keeps every field and nests every
+    relation, which is the default representation.
+    """
+
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self.requested_fields = fields
+        self.requested_expand = expand
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.requested_fields is None and self.requested_expand is None:
+            return fields
+
+        if self.requested_fields is not None:
+            names = top_level(self.requested_fields)
+            for name in list(fields):
+                if name not in names:
+                    del fields[name]
+
+        for name, serializer_class in self.expandable_fields.items():
+            if name not in fields:
+                continue
+            if self.requested_expand is not None and name not in top_level(self.requested_expand):
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+            else:
+                fields[name] = serializer_class(
+                    read_only=True,
+                    fields=nested_fields(self.requested_fields, name),
+                    expand=nested_expand(self.requested_expand, name),
+                )
+        return fields
+
+
+class TimedRepresentationMixin:
+
+    """Add the time spent in `to_representation` to the request metrics.
+
+    Only the outermost serializer is timed, nested ones run within it. Put
+    it first in the bases so cache hits are timed too.
+    """
+
+    def to_representation(self, instance):
+        timings = metrics.current.get()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+        timings.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serialization_time += time.perf_counter() - start
+            timings.serializing = False
+
+
+class CachedRepresentationMixin:
+
+    """Cache the representation of instances, see `api.cache`.
+
+    Only the default representation is cached, not the ones restricted with
+    `fields`/`expand`. Override `get_cache_version` when the representation
+    depends on more than the instance `updated_at`, e.g. nested objects.
+    """
+
+    def get_cache_version(self, instance):
+        return instance.updated_at.isoformat()
+
+    def is_cacheable(self):
+        return (
+            getattr(self, 'requested_fields', None) is None
+            and getattr(self, 'requested_expand', None) is None
+        )
+
+    def to_representation(self, instance):
+        if not self.is_cacheable():
+            return super().to_representation(instance)
+
+        model = type(instance)
+        version = self.get_cache_version(instance)
+        data = cache.lookup(model, instance.pk, version)
+        if data is None:
+            data = super().to_representation(instance)
+            cache.store(model, instance.pk, version, data)
+        return data
+
+
+class PrefetchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+
+    """Primary key related field able to resolve values prefetched in bulk.
+
+    `BulkListSerializer` calls `prefetch` with the values of every item so
+    validating many items costs one query per relation instead of one query
+    per item.
+    """
+
+    prefetched = None
+
+    def prefetch(self, values):
+        pk = self.get_queryset().model._meta.pk
+        pks = set()
+        for value in values:
+            try:
+                pks.add(pk.to_python(value))
+            except (AttributeError, TypeError, ValueError, DjangoValidationError):
+                pass
+        self.prefetched = self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        if self.prefetched is None or self.pk_field is not None or isinstance(data, bool):
+            return super().to_internal_value(data)
+        pk = self.get_queryset().model._meta.pk
+        try:
+            value = pk.to_python(data)
+        except (AttributeError, TypeError, ValueError, DjangoValidationError):
+            return super().to_internal_value(data)
+        try:
+            return self.prefetched[value]
+        except (KeyError, TypeError):
+            self.fail('does_not_exist', pk_value=data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+
+    """List serializer validating and creating many items at once.
+
+    Related objects are prefetched once for all items, the child serializer
+    can validate the whole batch in `validate_bulk` and items are inserted
+    with `bulk_create`. The child serializer should use `BulkSerializerMixin`.
+    """
+
+    batch_size = 1000
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.prefetch_related(data)
+        items = super().to_internal_value(data)
+        errors = self.child.validate_bulk(items)
+        if errors and any(errors):
+            raise ValidationError(errors)
+        return items
+
+    def prefetch_related(self, data):
+        for field in self.child._writable_fields:
+            if isinstance(field, PrefetchPrimaryKeyRelatedField):
+                field.prefetch(
+                    item[field.field_name] for item in data
+                    if isinstance(item, dict) and item.get(field.field_name) is not None
+                )
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        instances = [model(**attrs) for attrs in validated_data]
+        self.child.pre_bulk_create(instances)
+        signals.pre_bulk_create.send(sender=model, instances=instances)
+        model.objects.bulk_create(instances, batch_size=self.batch_size)
+        self.child.post_bulk_create(instances)
+        signals.post_bulk_create.send(sender=model, instances=instances)
+        return instances
+
+
+class BulkSerializerMixin:
+
+    """Hooks used by `BulkListSerializer` on its child serializer.
+
+    Set `list_serializer_class = BulkListSerializer` in the serializer Meta.
+    """
+
+    serializer_related_field = PrefetchPrimaryKeyRelatedField
+
+    @property
+    def in_bulk(self):
+        return isinstance(self.parent, BulkListSerializer)
+
+    def validate_bulk(self, items):
+        """Validate all items together, return a list of errors per item."""
+        return None
+
+    def pre_bulk_create(self, instances):
+        """Called before inserting instances, `save()` is not called."""
+
+    def post_bulk_create(self, instances):
+        """Called after inserting instances, `post_save` is not sent."""
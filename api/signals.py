@@ -0,0 +1,13 @@
+from django.dispatch import Signal
+
+# Sent around `bulk_create` calls, which do not send `pre_save`/`post_save`,
+# by `api.serializers.BulkListSerializer` and the `load_fixtures` command.
+# Arguments: `sender` (the model) and `instances`. Receivers of
+# `pre_bulk_create` may still change the instances, e.g. fill fields.
+pre_bulk_create = Signal()
+post_bulk_create = Signal()
+
+# Sent by set-based updates (`QuerySet.update`), which do not send
+# `post_save` either, e.g. `Listing.objects.set_platform_fees`.
+# Arguments: `sender` (the model) and `pks`, the updated primary keys.
+post_bulk_update = Signal()
@@ -0,0 +1,21 @@
+from django.http import StreamingHttpResponse
+
+from .renderers import NDJSONRenderer, dumps
+
+
+def iter_ndjson(queryset, serializer, chunk_size=2000):
+    """Yield one JSON line per instance of the queryset.
+
+    The queryset is iterated server-side in chunks of `chunk_size` rows and
+    each row is serialized as it is read, so memory use does not depend on
+    the size of the table.
+    """
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        yield dumps(serializer.to_representation(instance)) + b'\n'
+
+
+def ndjson_response(queryset, serializer, chunk_size=2000):
+    return StreamingHttpResponse(
+        iter_ndjson(queryset, serializer, chunk_size=chunk_size),
+        content_type=NDJSONRenderer.media_type,
+    )
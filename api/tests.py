@@ -1,3 +1,716 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import json
+import os
+import random
+import tempfile
+import uuid
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import msgpack
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from listings.api_v1.serializers import ListingReadSerializer
+from listings.models import Listing
+from properties.models import Property
+from reservations.api_v1.serializers import ReservationReadSerializer
+from reservations.models import Occupancy, Reservation
+
+from . import cache, compression, fixtures, loadtest, metrics, renderers
+from .backends.sqlite3.base import DatabaseWrapper
+from .renderers import FastJSONRenderer, MessagePackRenderer
+from .serializers import FastRepresentationMixin
+
+
+class StockReservationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Reservation
+        fields = '__all__'
+
+
+class FastReservationSerializer(FastRepresentationMixin, StockReservationSerializer):
+    pass
+
+
+class FastRepresentationTests(TestCase):
+
+    def setUp(self):
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        self.listing = Listing.objects.create(
+            platform='Airbnb',
+            platform_fee=5.0,
+            property=self.property,
+        )
+
+    def create_reservation(self, listing):
+        return Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 7),
+            price=50.0,
+            total_guests=1,
+            listing=listing,
+        )
+
+    def test_same_output_as_drf(self):
+        """
+        Ensure the fast path returns the same representation as DRF.
+        """
+        reservations = [self.create_reservation(self.listing), self.create_reservation(None)]
+        self.assertEqual(
+            StockReservationSerializer(reservations, many=True).data,
+            FastReservationSerializer(reservations, many=True).data,
+        )
+
+    def test_nested_read_serializer_is_reused(self):
+        """
+        Ensure nested read serializers are not instantiated for every row.
+        """
+        reservations = [self.create_reservation(self.listing) for _ in range(3)]
+        with mock.patch(
+            'listings.api_v1.serializers.ListingReadSerializer',
+            wraps=ListingReadSerializer,
+        ) as read_serializer_class:
+            ReservationReadSerializer(reservations, many=True).data
+        self.assertEqual(read_serializer_class.call_count, 1)
+
+
+class RepresentationCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        cache.reset_stats()
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        self.listing = Listing.objects.create(
+            platform='Airbnb',
+            platform_fee=5.0,
+            property=self.property,
+        )
+        self.url = reverse('api:v1:listings:listing-detail', kwargs={'pk': self.listing.id})
+
+    def test_cache_hit(self):
+        """
+        Ensure a listing is serialized once and then read from the cache.
+        """
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        second = self.client.get(self.url)
+        self.assertEqual(first.data, second.data)
+
+        response = self.client.get(reverse('api:v1:cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(1, response.data['hits'])
+        self.assertEqual(2, response.data['misses'])
+
+    def test_invalidate_on_save(self):
+        """
+        Ensure cached listings are invalidated when they or their property change.
+        """
+        self.client.get(self.url)
+        key = cache.make_key(Listing, self.listing.pk)
+        self.assertIsNotNone(cache.get_cache().get(key))
+
+        self.property.code = 'property2'
+        self.property.save()
+        self.assertIsNone(cache.get_cache().get(key))
+        response = self.client.get(self.url)
+        self.assertEqual('property2', response.data['property']['code'])
+
+        self.listing.platform = 'Cloudbeds'
+        self.listing.save()
+        self.assertIsNone(cache.get_cache().get(key))
+        response = self.client.get(self.url)
+        self.assertEqual('Cloudbeds', response.data['platform'])
+
+    def test_sparse_representation_not_cached(self):
+        """
+        Ensure representations restricted with fields are not cached.
+        """
+        response = self.client.get(self.url, {'fields': 'id'})
+        self.assertEqual({'id': str(self.listing.id)}, response.data)
+        self.assertIsNone(cache.get_cache().get(cache.make_key(Listing, self.listing.pk)))
+
+
+class SQLiteBackendTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db.sqlite3')
+
+    def connect(self, **options):
+        wrapper = DatabaseWrapper({
+            'NAME': self.name,
+            'OPTIONS': options,
+            'TIME_ZONE': None,
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+            'AUTOCOMMIT': True,
+        })
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def execute(self, wrapper, sql):
+        with wrapper.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchone()
+
+    def test_defaults(self):
+        wrapper = self.connect(timeout=1)
+        self.assertEqual(self.execute(wrapper, 'PRAGMA journal_mode'), ('wal',))
+        self.assertEqual(self.execute(wrapper, 'PRAGMA synchronous'), (1,))  # NORMAL
+        self.assertEqual(self.execute(wrapper, 'PRAGMA busy_timeout'), (1000,))
+
+    def test_options(self):
+        wrapper = self.connect(journal_mode='DELETE', synchronous='FULL')
+        self.assertEqual(self.execute(wrapper, 'PRAGMA journal_mode'), ('delete',))
+        self.assertEqual(self.execute(wrapper, 'PRAGMA synchronous'), (2,))
+
+    def test_transactions_take_the_write_lock(self):
+        """
+        Ensure a transaction holds the write lock before its first write.
+        """
+        wrapper = self.connect(timeout=0)
+        other = self.connect(timeout=0)
+        self.execute(wrapper, 'CREATE TABLE t (id integer)')
+
+        wrapper._start_transaction_under_autocommit()
+        self.execute(wrapper, 'SELECT * FROM t')
+        with self.assertRaisesMessage(OperationalError, 'database is locked'):
+            self.execute(other, 'INSERT INTO t VALUES (1)')
+        self.execute(wrapper, 'ROLLBACK')
+        self.execute(other, 'INSERT INTO t VALUES (1)')
+
+
+class LoadTestTests(TestCase):
+
+    def test_scenarios_run_on_seeded_data(self):
+        """
+        Ensure every benchmark scenario succeeds on a small seeded dataset.
+        """
+        loadtest.seed(3, 2, 4)
+        self.assertEqual(loadtest.benchmark_properties().count(), 3)
+        self.assertEqual(Reservation.objects.count(), 3 * 2 * 4)
+
+        samples = loadtest.Samples(random.Random(0))
+        for name, make_request in loadtest.scenarios(samples):
+            with self.subTest(name):
+                result = loadtest.run(name, make_request, requests=2)
+                self.assertEqual(result['requests'], 2)
+                self.assertGreater(result['throughput'], 0)
+                self.assertGreater(result['queries'], 0)
+
+        loadtest.clear()
+        self.assertFalse(loadtest.benchmark_properties().exists())
+        self.assertFalse(Reservation.objects.filter(listing__isnull=False).exists())
+
+
+class BatchTests(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('api:v1:batch')
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        self.listing = Listing.objects.create(
+            platform='Airbnb',
+            platform_fee=5.0,
+            property=self.property,
+        )
+
+    def test_batch(self):
+        """
+        Ensure sub-requests return the same bodies as separate requests, in order.
+        """
+        paths = [
+            reverse('api:v1:properties:property-detail', kwargs={'pk': self.property.id}),
+            reverse('api:v1:listings:listing-list') + '?property={}&fields=id'.format(self.property.id),
+            reverse('api:v1:listings:listing-detail', kwargs={'pk': self.property.id}),
+        ]
+        response = self.client.post(self.url, {'requests': paths}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        responses = response.json()['responses']
+        self.assertEqual([200, 200, 404], [item['status'] for item in responses])
+        for path, item in zip(paths, responses):
+            self.assertEqual(self.client.get(path).json(), item['body'])
+
+    def test_identical_requests_run_once(self):
+        path = reverse('api:v1:properties:property-detail', kwargs={'pk': self.property.id})
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, {'requests': [path, path]}, format='json')
+        first, second = response.json()['responses']
+        self.assertEqual(first, second)
+
+    def test_only_v1_endpoints(self):
+        paths = [reverse('api:metrics'), self.url, reverse('api:v1:reservations:reservation-export'), '/nope/']
+        response = self.client.post(self.url, {'requests': paths}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([400, 400, 400, 404], [item['status'] for item in response.json()['responses']])
+
+    def test_too_many_requests(self):
+        path = reverse('api:v1:properties:property-list')
+        response = self.client.post(self.url, {'requests': [path] * 51}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FastJSONRendererTests(TestCase):
+
+    def setUp(self):
+        property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        listing = Listing.objects.create(platform='Airbnb', platform_fee=5.0, property=property)
+        reservation = Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 1),
+            check_out=datetime.date(2023, 1, 3),
+            price=150,
+            total_guests=2,
+            comments='Late check-in ação',
+            listing=listing,
+        )
+        self.data = {
+            'results': ReservationReadSerializer([reservation], many=True).data,
+            'raw': [
+                Decimal('1.50'), uuid.uuid4(), datetime.date(2023, 1, 1), datetime.time(10, 30),
+                datetime.datetime(2023, 1, 1, 10, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+                'line\u2028separator', None, True, 2.5,
+            ],
+        }
+
+    def test_same_output_as_drf(self):
+        expected = JSONRenderer().render(self.data)
+        for backend in ('orjson', 'json'):
+            with self.subTest(backend=backend), override_settings(API_JSON_BACKEND=backend):
+                if backend == 'orjson' and renderers.orjson is None:
+                    self.skipTest('orjson is not installed')
+                self.assertEqual(expected, FastJSONRenderer().render(self.data))
+
+    @override_settings(API_JSON_BACKEND='orjson')
+    def test_orjson_required(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            with self.assertRaises(ImproperlyConfigured):
+                FastJSONRenderer().render(self.data)
+
+    def test_non_string_keys(self):
+        data = {1: 'one', 'two': Decimal('2.00')}
+        self.assertEqual(JSONRenderer().render(data), FastJSONRenderer().render(data))
+
+    def test_indent_is_left_to_drf(self):
+        self.assertEqual(
+            JSONRenderer().render(self.data, 'application/json; indent=4'),
+            FastJSONRenderer().render(self.data, 'application/json; indent=4'),
+        )
+
+
+class MessagePackTests(APITestCase):
+
+    def setUp(self):
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        self.listing = Listing.objects.create(
+            platform='Airbnb',
+            platform_fee=5.0,
+            property=self.property,
+        )
+        Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 1),
+            check_out=datetime.date(2023, 1, 3),
+            price=150,
+            total_guests=2,
+            listing=self.listing,
+        )
+
+    def test_render(self):
+        """
+        Ensure MessagePack responses carry the same values as JSON ones.
+        """
+        for url in (
+            reverse('api:v1:reservations:reservation-list'),
+            reverse('api:v1:listings:listing-detail', kwargs={'pk': self.listing.id}),
+            reverse('api:v1:reports:report') + '?group_by=property',
+        ):
+            response = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'application/msgpack')
+            self.assertEqual(self.client.get(url).json(), msgpack.unpackb(response.content))
+
+    def test_parse(self):
+        data = [
+            {'check_in': '2023-02-01', 'check_out': '2023-02-03', 'price': '80.00',
+             'total_guests': 2, 'listing': str(self.listing.id)},
+        ]
+        response = self.client.post(
+            reverse('api:v1:reservations:reservation-bulk'), msgpack.packb(data),
+            content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(2, Reservation.objects.count())
+
+    def test_typed_values_round_trip(self):
+        """
+        Ensure decimals, UUIDs and datetimes are encoded as strings and read back unchanged.
+        """
+        reservation = Reservation.objects.get()
+        url = reverse('api:v1:reservations:reservation-detail', kwargs={'pk': reservation.id})
+        data = msgpack.unpackb(self.client.get(url, HTTP_ACCEPT='application/msgpack').content)
+        self.assertEqual(str(reservation.id), data['id'])
+        self.assertEqual('150.00', data['price'])
+        self.assertEqual('2023-01-01', data['check_in'])
+        self.assertEqual(reservation.created_at.isoformat().replace('+00:00', 'Z'), data['created_at'])
+        self.assertEqual('5.00', data['listing']['platform_fee'])
+
+        # Values not converted by a serializer are encoded like DRF's JSON encoder does.
+        raw = [
+            Decimal('1.50'), uuid.uuid4(),
+            datetime.datetime(2023, 1, 1, 10, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        ]
+        self.assertEqual(
+            json.loads(JSONRenderer().render(raw)),
+            msgpack.unpackb(MessagePackRenderer().render(raw)),
+        )
+
+        response = self.client.post(
+            reverse('api:v1:reservations:reservation-bulk'),
+            msgpack.packb([{
+                'check_in': '2023-02-01', 'check_out': '2023-02-03', 'price': data['price'],
+                'total_guests': 2, 'listing': data['listing']['id'],
+            }]),
+            content_type='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        created = Reservation.objects.get(pk=response.data[0]['id'])
+        self.assertEqual(Decimal('150.00'), created.price)
+        self.assertEqual(self.listing.id, created.listing_id)
+
+    def test_parse_error(self):
+        response = self.client.post(
+            reverse('api:v1:reservations:reservation-list'), b'\xc1',
+            content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(API_COMPRESSION_MIN_SIZE=100)
+class CompressionTests(APITestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        self.url = reverse('api:v1:properties:property-list')
+
+    def test_negotiate(self):
+        self.assertEqual('gzip', compression.negotiate('gzip, deflate, br', ['gzip', 'br']))
+        self.assertEqual('br', compression.negotiate('gzip;q=0.5, br', ['gzip', 'br']))
+        self.assertEqual('br', compression.negotiate('*', ['br', 'gzip']))
+        self.assertEqual('gzip', compression.negotiate('br;q=0, *;q=0.1', ['br', 'gzip']))
+        self.assertIsNone(compression.negotiate('identity', ['br', 'gzip']))
+        self.assertIsNone(compression.negotiate('', ['br', 'gzip']))
+
+    def test_compressed(self):
+        plain = self.client.get(self.url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual('Accept-Encoding', plain['Vary'].split(', ')[-1])
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual('gzip', response['Content-Encoding'])
+        self.assertEqual(str(len(response.content)), response['Content-Length'])
+        self.assertEqual(plain.content, gzip.decompress(response.content))
+        self.assertEqual('W/' + plain['ETag'], response['ETag'])
+
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(API_COMPRESSION_MIN_SIZE=10000)
+    def test_small_responses_not_compressed(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_compressed_once(self):
+        """
+        Ensure unchanged responses are served from the compressed cache.
+        """
+        with mock.patch.dict(compression.CODECS, gzip=mock.Mock(wraps=compression.compress_gzip)):
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            second = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(first.content, second.content)
+            self.assertEqual(1, compression.CODECS['gzip'].call_count)
+
+            self.property.code = 'property2'
+            self.property.save()
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(2, compression.CODECS['gzip'].call_count)
+        self.assertIn(b'property2', gzip.decompress(response.content))
+
+    @override_settings(API_COMPRESSION_MIN_SIZE=0)
+    def test_compressed_per_host(self):
+        """
+        Ensure links to a host are not served from the cache to another one.
+        """
+        Property.objects.create(
+            code='property2',
+            guest_limit=3,
+            bathrooms=1,
+            accept_pets=True,
+            cleaning_price=10.0,
+        )
+        for host in ('internal.local', 'api.example.com'):
+            response = self.client.get(
+                self.url, {'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip', HTTP_HOST=host)
+            self.assertEqual('gzip', response['Content-Encoding'])
+            self.assertTrue(json.loads(gzip.decompress(response.content))['next'].startswith(
+                'http://{}/'.format(host)))
+
+    @override_settings(API_COMPRESSION_MIN_SIZE=0)
+    def test_compressed_after_related_delete(self):
+        """
+        Ensure a compressed collection is not served again after a related row is deleted.
+        """
+        Listing.objects.create(platform='Airbnb', platform_fee=5.0, property=self.property)
+        url = reverse('api:v1:listings:listing-list')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIsNotNone(json.loads(gzip.decompress(response.content))['results'][0]['property'])
+
+        self.property.delete()
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIsNone(json.loads(gzip.decompress(response.content))['results'][0]['property'])
+
+    def test_streaming(self):
+        url = reverse('api:v1:reservations:reservation-export')
+        plain = b''.join(self.client.get(url).streaming_content)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual('gzip', response['Content-Encoding'])
+        self.assertEqual(plain, gzip.decompress(b''.join(response.streaming_content)))
+
+    def test_only_api_v1(self):
+        response = self.client.get(reverse('api:metrics'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class MetricsTests(APITestCase):
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+
+    def test_server_timing(self):
+        response = self.client.get(reverse('api:v1:properties:property-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="2 queries", serialization;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+
+    def test_serialization_time(self):
+        """
+        Ensure only the outermost API serializer is timed.
+        """
+        Listing.objects.create(platform='Airbnb', platform_fee=5.0, property=self.property)
+        timings = metrics.RequestTimings()
+        token = metrics.current.set(timings)
+        try:
+            with mock.patch('api.serializers.time') as time:
+                time.perf_counter.side_effect = [1.0, 1.5]
+                data = ListingReadSerializer(Listing.objects.get()).data
+        finally:
+            metrics.current.reset(token)
+        self.assertEqual('property1', data['property']['code'])
+        self.assertEqual(0.5, timings.serialization_time)
+        self.assertFalse(timings.serializing)
+        self.assertNotIn('timed', vars(serializers.BaseSerializer.data.fget))
+
+    def test_metrics_endpoint(self):
+        """
+        Ensure totals are exposed per endpoint in the Prometheus format.
+        """
+        for _ in range(2):
+            response = self.client.get(reverse('api:v1:properties:property-list'))
+        size = len(response.content)
+
+        response = self.client.get(reverse('api:metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4')
+        body = response.content.decode()
+        labels = 'method="GET",endpoint="api:v1:properties:property-list"'
+        self.assertIn('khanto_requests_total{{{}}} 2\n'.format(labels), body)
+        self.assertIn('khanto_request_queries_total{{{}}} 4\n'.format(labels), body)
+        self.assertIn('khanto_response_bytes_total{{{}}} {}\n'.format(labels, size * 2), body)
+        self.assertIn('khanto_request_duration_seconds_bucket{{{},le="+Inf"}} 2\n'.format(labels), body)
+        self.assertIn('khanto_request_duration_seconds_count{{{}}} 2\n'.format(labels), body)
+
+    def test_streaming_response_bytes(self):
+        response = self.client.get(reverse('api:v1:reservations:reservation-export'))
+        size = len(b''.join(response.streaming_content))
+        totals = metrics.registry.endpoints['GET', 'api:v1:reservations:reservation-export']
+        self.assertEqual(totals['response_bytes'], size)
+
+    @override_settings(API_SLOW_REQUEST_SECONDS=0)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('api.slow_requests', 'WARNING') as logs:
+            self.client.get(reverse('api:v1:properties:property-detail', kwargs={'pk': self.property.id}))
+        self.assertIn('Slow request GET /api/v1/properties/', logs.output[0])
+        self.assertIn('FROM "properties_property"', logs.output[0])
+
+
+class FixtureLoaderTests(TestCase):
+
+    def fixture(self, name):
+        return os.path.join(settings.BASE_DIR, 'fixtures', name)
+
+    def write(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_iter_json_array(self):
+        """
+        Ensure objects are parsed whatever the chunk boundaries.
+        """
+        with open(self.fixture('reservations.json')) as f:
+            content = f.read()
+        for chunk_size in (1, 7, 100, 10 ** 6):
+            with self.subTest(chunk_size=chunk_size):
+                objects = list(fixtures.iter_json_array(io.StringIO(content), chunk_size))
+                self.assertEqual(objects, json.loads(content))
+        self.assertEqual(list(fixtures.iter_json_array(io.StringIO(' [ ] '))), [])
+
+    def test_iter_json_array_errors(self):
+        for content in ('{}', '[{"a": 1}', '[{"a": 1},]', '[{"a": 1} {"b": 2}]', '[1]'):
+            with self.subTest(content=content):
+                with self.assertRaises(fixtures.FixtureError):
+                    list(fixtures.iter_json_array(io.StringIO(content), 4))
+
+    def test_load_fixtures(self):
+        """
+        Ensure the repository fixtures load like with loaddata, in any order.
+        """
+        call_command(
+            'load_fixtures', 'reservations.json', 'listings.json', 'properties.json',
+            '--batch-size', '2', verbosity=0)
+        loaded = {
+            model: list(model.objects.order_by('pk').values())
+            for model in (Property, Listing, Reservation)
+        }
+        Reservation.objects.all().delete()
+        Listing.objects.all().delete()
+        Property.objects.all().delete()
+
+        call_command('loaddata', self.fixture('properties.json'), self.fixture('listings.json'),
+                     self.fixture('reservations.json'), verbosity=0)
+        for model, rows in loaded.items():
+            self.assertEqual(rows, list(model.objects.order_by('pk').values()))
+
+    def test_raw_insert(self):
+        """
+        Ensure raw inserts keep auto_now timestamps, they rely on a private Django API.
+        """
+        created_at = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        property = Property(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        fixtures.raw_insert(Property, [property], Property._meta.concrete_fields, 'default')
+        self.assertEqual(
+            (created_at, created_at),
+            Property.objects.values_list('created_at', 'updated_at').get(pk=property.pk),
+        )
+
+    def test_load_existing_objects(self):
+        """
+        Ensure objects already in the database are not updated, unlike with loaddata.
+        """
+        call_command('load_fixtures', 'properties.json', verbosity=0)
+        with self.assertRaises(IntegrityError):
+            call_command('load_fixtures', 'properties.json', verbosity=0)
+
+    def test_load_ndjson(self):
+        """
+        Ensure missing codes and timestamps are filled and occupancy is updated.
+        """
+        call_command('load_fixtures', 'properties.json', 'listings.json', verbosity=0)
+        listing = Listing.objects.filter(property__isnull=False).first()
+        path = self.write('reservations.ndjson', json.dumps({
+            'model': 'reservations.reservation',
+            'fields': {
+                'check_in': '2023-03-01',
+                'check_out': '2023-03-03',
+                'price': '100.00',
+                'total_guests': 2,
+                'listing': str(listing.pk),
+            },
+        }) + '\n')
+        call_command('load_fixtures', path, verbosity=0)
+
+        reservation = Reservation.objects.get()
+        self.assertEqual(len(reservation.code), 8)
+        self.assertIsNotNone(reservation.created_at)
+        self.assertTrue(Occupancy.objects.filter(property=listing.property_id).exists())
+
+    def test_missing_foreign_key(self):
+        path = self.write('listings.ndjson', json.dumps({
+            'model': 'listings.listing',
+            'fields': {
+                'platform': 'Airbnb',
+                'platform_fee': '5.00',
+                'property': '00000000-0000-0000-0000-000000000000',
+            },
+        }))
+        with self.assertRaisesMessage(CommandError, 'refers to a missing property'):
+            call_command('load_fixtures', path, verbosity=0)
+        self.assertFalse(Listing.objects.exists())
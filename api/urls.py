@@ -3,6 +3,8 @@ from rest_framework.schemas import get_schema_view
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from .views import metrics_view
+
 app_name = 'api'
 
 schema_url_patterns_v1 = [
@@ -22,5 +24,6 @@ urlpatterns = [
         template_name='swagger-ui.html',
         extra_context={'schema_url': 'api:openapi-schema-v1'}
     ), name='swagger-ui'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 urlpatterns += schema_url_patterns_v1
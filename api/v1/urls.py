@@ -1,9 +1,15 @@
 from django.urls import include, path
 
+from ..views import BatchView, CacheStatsView
+
 app_name = 'api_v1'
 
 urlpatterns = [
     path('', include('properties.api_v1.urls', namespace='properties')),
     path('', include('listings.api_v1.urls', namespace='listings')),
     path('', include('reservations.api_v1.urls', namespace='reservations')),
+    path('', include('changes.api_v1.urls', namespace='changes')),
+    path('', include('reports.api_v1.urls', namespace='reports')),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('batch/', BatchView.as_view(), name='batch'),
 ]
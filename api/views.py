@@ -1,3 +1,47 @@
-from django.shortcuts import render
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from django.conf import settings
+from django.http import HttpResponse
+
+from . import batch, cache, metrics
+
+
+class CacheStatsView(APIView):
+
+    """Hit/miss counters of the representation cache of this process."""
+
+    def get(self, request):
+        stats = cache.get_stats()
+        stats['backend'] = settings.CACHES[settings.API_CACHE_ALIAS]['BACKEND']
+        return Response(stats)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = serializers.ListField(
+        child=serializers.CharField(), allow_empty=False,
+        max_length=settings.API_BATCH_MAX_REQUESTS)
+
+
+class BatchView(APIView):
+
+    """Run many GET requests to API v1 endpoints at once.
+
+    The body is `{"requests": ["/api/v1/properties/{id}/", ...]}`, the
+    response lists the `status` and `body` of every request in order.
+    """
+
+    batchable = False
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({
+            'responses': batch.run(request._request, serializer.validated_data['requests']),
+        })
+
+
+def metrics_view(request):
+    """Request metrics of this process in the Prometheus text format."""
+    return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4')
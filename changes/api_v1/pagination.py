@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class ChangeFeedPagination(BasePagination):
+
+    """Return the changes after the `since` sequence number, oldest first.
+
+    `next` is the sequence number of the last change returned; clients store
+    it and send it back as `since` on their next sync. Changes commit in
+    sequence order (see `changes.models.lock_feed`) so none is committed
+    behind a client's `since`, and because sequence numbers only grow this
+    is a plain index range scan whatever the offset.
+    """
+
+    since_query_param = 'since'
+    limit_query_param = 'limit'
+    default_limit = 1000
+    max_limit = 10000
+
+    def get_integer(self, request, param, default, maximum=None):
+        value = request.query_params.get(param)
+        if value is None:
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({param: 'A valid integer is required.'})
+        if value < 0:
+            raise ValidationError({param: 'Ensure this value is greater than or equal to 0.'})
+        if maximum is not None:
+            value = min(value, maximum)
+        return value
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.since = self.get_integer(request, self.since_query_param, 0)
+        limit = self.get_integer(request, self.limit_query_param, self.default_limit, self.max_limit) or 1
+        # Fetch one extra row to know if there is more without a COUNT.
+        changes = list(queryset.filter(id__gt=self.since).order_by('id')[:limit + 1])
+        self.has_more = len(changes) > limit
+        self.page = changes[:limit]
+        return self.page
+
+    def get_paginated_response(self, data):
+        last = self.page[-1].id if self.page else self.since
+        return Response(OrderedDict([
+            ('next', last),
+            ('has_more', self.has_more),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'integer'},
+                'has_more': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
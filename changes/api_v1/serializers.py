@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from api.serializers import TimedRepresentationMixin
+
+from ..models import Change
+
+
+class ChangeSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    seq = serializers.IntegerField(source='id', read_only=True)
+
+    class Meta:
+        model = Change
+        fields = ['seq', 'model', 'object_id', 'action', 'created_at']
@@ -0,0 +1,185 @@
+import os
+import tempfile
+import threading
+import uuid
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from django.db import connections, transaction
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from listings.models import Listing
+from properties.models import Property
+from reservations.models import Reservation
+
+from ..models import Change
+
+
+class ChangeFeedTests(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('api:v1:changes:change-list')
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        self.listing = Listing.objects.create(
+            platform='Airbnb',
+            platform_fee=5.00,
+            property=self.property,
+        )
+
+    def feed(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_records_inserts_updates_and_deletes(self):
+        """
+        Ensure saves and deletes of tracked models show up in order.
+        """
+        property_id, listing_id = str(self.property.id), str(self.listing.id)
+        self.property.guest_limit = 6
+        self.property.save()
+        self.property.delete()
+
+        data = self.feed()
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['next'], data['results'][-1]['seq'])
+        self.assertEqual(
+            [(change['model'], change['object_id'], change['action']) for change in data['results']],
+            [
+                ('property', property_id, 'insert'),
+                ('listing', listing_id, 'insert'),
+                ('property', property_id, 'update'),
+                ('listing', listing_id, 'update'),
+                ('property', property_id, 'delete'),
+            ],
+        )
+
+    def test_since_and_limit(self):
+        """
+        Ensure clients can resume from the last sequence number they saw.
+        """
+        data = self.feed(limit=1)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(len(data['results']), 1)
+        self.assertEqual(data['results'][0]['model'], 'property')
+
+        data = self.feed(since=data['next'])
+        self.assertFalse(data['has_more'])
+        self.assertEqual([change['model'] for change in data['results']], ['listing'])
+
+        data = self.feed(since=data['next'])
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['next'], Change.objects.last().id)
+
+    def test_model_filter(self):
+        data = self.feed(model='listing')
+        self.assertEqual([change['object_id'] for change in data['results']], [str(self.listing.id)])
+
+    def test_invalid_since(self):
+        response = self.client.get(self.url, {'since': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_is_recorded(self):
+        """
+        Ensure reservations created in bulk are recorded too.
+        """
+        data = [
+            {
+                'check_in': '2023-01-{:02d}'.format(day),
+                'check_out': '2023-01-{:02d}'.format(day + 1),
+                'price': '50.00',
+                'total_guests': 2,
+                'listing': str(self.listing.id),
+            }
+            for day in range(1, 4)
+        ]
+        response = self.client.post(reverse('api:v1:reservations:reservation-bulk'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = self.feed(model='reservation')
+        self.assertCountEqual(
+            [change['object_id'] for change in data['results']],
+            [str(pk) for pk in Reservation.objects.values_list('id', flat=True)],
+        )
+
+    def test_bulk_update_is_recorded(self):
+        """
+        Ensure listings updated with set-based queries are recorded too.
+        """
+        Listing.objects.filter(pk=self.listing.pk).set_platform_fees(6)
+
+        data = self.feed(model='listing')
+        self.assertEqual(
+            [('insert', str(self.listing.id)), ('update', str(self.listing.id))],
+            [(change['action'], change['object_id']) for change in data['results']],
+        )
+
+
+class ChangeOrderTests(SimpleTestCase):
+
+    """Run concurrent writers on a file database, like a deployment does."""
+
+    alias = 'changes_order'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        connections.settings[self.alias] = {
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(directory.name, 'db.sqlite3'),
+        }
+        self.addCleanup(connections.settings.pop, self.alias)
+        self.addCleanup(connections[self.alias].close)
+        with connections[self.alias].schema_editor() as editor:
+            editor.create_model(Change)
+
+    def record(self, object_id):
+        Change.record(Property, [object_id], Change.Action.INSERT, using=self.alias)
+
+    def synced_ids(self):
+        return list(Change.objects.using(self.alias).order_by('id').values_list('object_id', flat=True))
+
+    def test_changes_commit_in_id_order(self):
+        """
+        Ensure a change can not become visible before one with a lower id.
+
+        Otherwise a client syncing in between would skip the lower one.
+        """
+        first, second = uuid.uuid4(), uuid.uuid4()
+        recorded, release, second_done = threading.Event(), threading.Event(), threading.Event()
+
+        def write_first():
+            try:
+                with transaction.atomic(using=self.alias):
+                    self.record(first)
+                    recorded.set()
+                    release.wait(5)
+            finally:
+                connections[self.alias].close()
+
+        def write_second():
+            try:
+                self.record(second)
+                second_done.set()
+            finally:
+                connections[self.alias].close()
+
+        threads = [threading.Thread(target=write_first), threading.Thread(target=write_second)]
+        threads[0].start()
+        self.assertTrue(recorded.wait(5))
+        threads[1].start()
+
+        self.assertFalse(second_done.wait(0.3))
+        self.assertEqual([], self.synced_ids())
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual([first, second], self.synced_ids())
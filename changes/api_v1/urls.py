@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import ChangeList
+
+app_name = 'changes_api_v1'
+
+urlpatterns = [
+    path('changes/', ChangeList.as_view(), name='change-list'),
+]
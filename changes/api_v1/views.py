@@ -0,0 +1,25 @@
+from rest_framework import generics
+
+from ..models import Change
+from .pagination import ChangeFeedPagination
+from .serializers import ChangeSerializer
+
+
+class ChangeList(generics.ListAPIView):
+
+    """Changes to properties, listings and reservations, for delta syncs.
+
+    Filter by `?model=property|listing|reservation`, page with `?since=`.
+    """
+
+    queryset = Change.objects.all()
+    serializer_class = ChangeSerializer
+    pagination_class = ChangeFeedPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        model = self.request.query_params.get('model')
+        if model:
+            queryset = queryset.filter(model=model)
+        return queryset
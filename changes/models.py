@@ -0,0 +1,65 @@
+from django.db import connections, models, router, transaction
+from django.utils.translation import gettext_lazy as _
+
+# Key of the PostgreSQL advisory lock serializing change inserts.
+FEED_LOCK_KEY = 0x6b68616e746f
+
+
+def lock_feed(using):
+    """Make transactions recording changes commit one at a time, in id order.
+
+    Clients resume the feed after the last id they saw, so a transaction
+    committing a lower id after a higher one is visible would be skipped
+    forever. The lock is held until the end of the transaction. SQLite
+    already allows a single writing transaction at a time.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [FEED_LOCK_KEY])
+
+
+class Change(models.Model):
+
+    """A property, listing or reservation inserted, updated or deleted.
+
+    The auto incremented `id` is the change sequence number partners sync
+    from, see `changes.api_v1`.
+    """
+
+    class Action(models.TextChoices):
+        INSERT = 'insert', _('Insert')
+        UPDATE = 'update', _('Update')
+        DELETE = 'delete', _('Delete')
+
+    model = models.CharField(_('Model'), max_length=50)
+    object_id = models.UUIDField(_('Object id'))
+    action = models.CharField(_('Action'), max_length=10, choices=Action.choices)
+    created_at = models.DateTimeField(_('Created at'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Change')
+        verbose_name_plural = _('Changes')
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['model', 'id'], name='change_model_id_idx'),
+        ]
+
+    def __str__(self):
+        return '{} {} {}'.format(self.action, self.model, self.object_id)
+
+    @classmethod
+    def last_id(cls, using=None):
+        """Return the id of the last change, None when the feed is empty."""
+        return cls.objects.using(using).order_by('-id').values_list('id', flat=True).first()
+
+    @classmethod
+    def record(cls, model, object_ids, action, using=None):
+        """Record the same change for many objects with one query, see `lock_feed`."""
+        using = using or router.db_for_write(cls)
+        with transaction.atomic(using=using, savepoint=False):
+            lock_feed(using)
+            cls.objects.using(using).bulk_create([
+                cls(model=model._meta.model_name, object_id=object_id, action=action)
+                for object_id in object_ids
+            ])
@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from api.signals import post_bulk_create, post_bulk_update
+from listings.models import Listing
+from properties.models import Property
+from reservations.models import Reservation
+
+from .models import Change
+
+TRACKED_MODELS = (Property, Listing, Reservation)
+
+
+def record_save(sender, instance, created, using, **kwargs):
+    action = Change.Action.INSERT if created else Change.Action.UPDATE
+    Change.record(sender, [instance.pk], action, using=using)
+
+
+def record_delete(sender, instance, using, **kwargs):
+    Change.record(sender, [instance.pk], Change.Action.DELETE, using=using)
+
+
+def record_bulk_create(sender, instances, **kwargs):
+    Change.record(sender, [instance.pk for instance in instances], Change.Action.INSERT)
+
+
+def record_bulk_update(sender, pks, **kwargs):
+    Change.record(sender, pks, Change.Action.UPDATE)
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(record_save, sender=model, dispatch_uid='changes_save_{}'.format(model._meta.model_name))
+    post_delete.connect(record_delete, sender=model, dispatch_uid='changes_delete_{}'.format(model._meta.model_name))
+    post_bulk_create.connect(
+        record_bulk_create, sender=model, dispatch_uid='changes_bulk_create_{}'.format(model._meta.model_name))
+    post_bulk_update.connect(
+        record_bulk_update, sender=model, dispatch_uid='changes_bulk_update_{}'.format(model._meta.model_name))
+
+
+@receiver(pre_delete, sender=Property)
+def record_property_listings(sender, instance, using, **kwargs):
+    """Listings of a deleted property lose their property without a save."""
+    listings = Listing.objects.using(using).filter(property=instance.pk).values_list('pk', flat=True)
+    Change.record(Listing, listings, Change.Action.UPDATE, using=using)
+
+
+@receiver(pre_delete, sender=Listing)
+def record_listing_reservations(sender, instance, using, **kwargs):
+    """Reservations of a deleted listing lose their listing without a save."""
+    reservations = Reservation.objects.using(using).filter(listing=instance.pk).values_list('pk', flat=True)
+    Change.record(Reservation, reservations, Change.Action.UPDATE, using=using)
@@ -45,9 +45,13 @@ INSTALLED_APPS = [
     'properties',
     'listings',
     'reservations',
+    'changes',
+    'reports',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,14 +86,78 @@ WSGI_APPLICATION = 'khanto.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
+#
+# DATABASE_ENGINE is 'sqlite' (default) or 'postgresql' (requires psycopg2).
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds and checked
+# before being reused. With PostgreSQL behind a transaction pooler such as
+# PgBouncer set DATABASE_POOLER=transaction: server side cursors do not
+# survive across pooled transactions so they are disabled.
+# SQLite runs in WAL mode with immediate transactions, see
+# api.backends.sqlite3.
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'khanto'),
+            'USER': os.environ.get('DATABASE_USER', ''),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', ''),
+            'PORT': os.environ.get('DATABASE_PORT', ''),
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DATABASE_POOLER') == 'transaction',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DATABASE_CONNECT_TIMEOUT', 5)),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'api.backends.sqlite3',
+            'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Seconds a writer waits for the lock before "database is locked".
+                'timeout': int(os.environ.get('DATABASE_BUSY_TIMEOUT', 20)),
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
 
-DATABASES = {
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+#
+# The 'api' cache holds serialized properties and listings (see api.cache).
+# It uses local memory by default, set API_CACHE_BACKEND to e.g.
+# 'django.core.cache.backends.filebased.FileBasedCache' (API_CACHE_LOCATION
+# being a directory) or 'django.core.cache.backends.db.DatabaseCache'
+# (API_CACHE_LOCATION being a table created with `manage.py createcachetable`).
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.environ.get(
+            'API_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('API_CACHE_LOCATION', 'api'),
+        'TIMEOUT': int(os.environ.get('API_CACHE_TIMEOUT', 60 * 60 * 24)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('API_CACHE_MAX_ENTRIES', 100000)),
+        },
+    },
 }
 
+API_CACHE_ALIAS = 'api'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -132,6 +200,44 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'api.parsers.MessagePackParser',
+    ],
+    'DEFAULT_FILTER_BACKENDS': ['api.filters.FieldFilterBackend'],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 100,
+}
+
+# Per-endpoint request metrics served on /metrics, see api.middleware.
+# Requests slower than API_SLOW_REQUEST_SECONDS are logged with their SQL.
+API_METRICS_ENABLED = os.environ.get('API_METRICS_ENABLED', '1') == '1'
+API_SLOW_REQUEST_SECONDS = float(os.environ.get('API_SLOW_REQUEST_SECONDS', 1.0))
+
+# JSON encoder of the API responses: 'orjson', 'json' (the standard library)
+# or 'auto' to use orjson when it is installed.
+API_JSON_BACKEND = os.environ.get('API_JSON_BACKEND', 'auto')
+
+# Compress API v1 responses of at least API_COMPRESSION_MIN_SIZE bytes with
+# the first of these encodings accepted by the client and installed.
+API_COMPRESSION_ENCODINGS = ['br', 'zstd', 'gzip']
+API_COMPRESSION_MIN_SIZE = int(os.environ.get('API_COMPRESSION_MIN_SIZE', 1024))
+
+# Maximum number of sub-requests of a POST /api/v1/batch/.
+API_BATCH_MAX_REQUESTS = 50
+
+# Reject reservations overlapping others on the same 'listing' or on any
+# listing of the same 'property'.
+RESERVATION_OVERLAP_SCOPE = 'listing'
+
 FIXTURES_DIR = [
     os.path.join(BASE_DIR, 'fixtures'),
 ]
@@ -0,0 +1,55 @@
+"""
+Settings for nodes serving only the REST API.
+
+Use with DJANGO_SETTINGS_MODULE=khanto.settings_api. The admin, sessions,
+messages and authentication apps and their middleware are left out, the
+API does not use them. Run the admin with the default khanto.settings.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    'rest_framework',
+
+    'api',
+    'properties',
+    'listings',
+    'reservations',
+    'changes',
+    'reports',
+]
+
+MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.CompressionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'khanto.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [
+            os.path.join(BASE_DIR, 'templates')
+        ],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    # Every endpoint is public, do not look for users.
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'UNAUTHENTICATED_USER': None,
+}
@@ -1,20 +1,31 @@
 from rest_framework import serializers
 
+from django.utils.functional import cached_property
+
+from api.serializers import (
+    BulkListSerializer, BulkSerializerMixin, CachedRepresentationMixin, DynamicFieldsMixin,
+    FastRepresentationMixin, TimedRepresentationMixin)
 from properties.api_v1.serializers import PropertySerializer
 
 from ..models import Listing
 
 
-class ListingSerializer(serializers.ModelSerializer):
+class ListingSerializer(BulkSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Listing
         fields = '__all__'
+        list_serializer_class = BulkListSerializer
+
+    @cached_property
+    def read_serializer(self):
+        return ListingReadSerializer(context=self.context)
 
     def to_representation(self, instance):
-        return ListingReadSerializer().to_representation(instance)
+        return self.read_serializer.to_representation(instance)
 
 
-class ListingReadSerializer(serializers.ModelSerializer):
+class ListingReadSerializer(TimedRepresentationMixin, CachedRepresentationMixin, DynamicFieldsMixin,
+                            FastRepresentationMixin, serializers.ModelSerializer):
 
     """Serializer to use when showing/returning a listing.
 
@@ -26,6 +37,44 @@ class ListingReadSerializer(serializers.ModelSerializer):
 
     property = PropertySerializer(read_only=True)
 
+    expandable_fields = {'property': PropertySerializer}
+
+    def get_cache_version(self, instance):
+        property = instance.property
+        return (
+            instance.updated_at.isoformat(),
+            property and property.pk,
+            property and property.updated_at.isoformat(),
+        )
+
     class Meta:
         model = Listing
         fields = '__all__'
+
+
+class ListingFeeSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    platform_fee = serializers.DecimalField(max_digits=11, decimal_places=2)
+
+
+class ListingFeeUpdateSerializer(serializers.Serializer):
+
+    """Body of `PATCH listings/fees/`.
+
+    Either one `platform_fee` for every listing matching the query
+    parameters or a list of `items` with their own fee.
+    """
+
+    platform_fee = serializers.DecimalField(max_digits=11, decimal_places=2, required=False)
+    items = ListingFeeSerializer(many=True, required=False)
+    return_ids = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if ('platform_fee' in data) == ('items' in data):
+            raise serializers.ValidationError('Set either `platform_fee` or `items`.')
+        return data
+
+    def get_fees(self):
+        if 'items' in self.validated_data:
+            return {item['id']: item['platform_fee'] for item in self.validated_data['items']}
+        return self.validated_data['platform_fee']
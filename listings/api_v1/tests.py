@@ -1,10 +1,18 @@
+import datetime
 import json
+from unittest import mock
 
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from django.core.management import call_command
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 
 from properties.models import Property
 
@@ -60,6 +68,41 @@ class ListingTests(APITestCase):
             },
         }, json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)))
 
+    def test_bulk_create_listings(self):
+        """
+        Ensure we can create many listings with one request.
+        """
+        data = [
+            {'platform': 'Airbnb', 'platform_fee': '5.00', 'property': str(self.property.id)},
+            {'platform': 'Cloudbeds', 'platform_fee': '4.00', 'property': str(self.property.id)},
+            {'platform': 'Booking', 'platform_fee': '3.00', 'property': None},
+        ]
+        url = reverse('api:v1:listings:listing-bulk')
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Listing.objects.count(), 3)
+        self.assertCountEqual(
+            [{'id': str(id)} for id in Listing.objects.values_list('id', flat=True)],
+            json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)),
+        )
+
+    def test_bulk_create_listings_with_errors(self):
+        """
+        Ensure nothing is created when a listing is invalid.
+        """
+        data = [
+            {'platform': 'Airbnb', 'platform_fee': '5.00', 'property': str(self.property.id)},
+            {'platform': 'Cloudbeds', 'platform_fee': 'free', 'property': str(self.property.id)},
+        ]
+        url = reverse('api:v1:listings:listing-bulk')
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Listing.objects.count(), 0)
+        self.assertEqual({}, response.data[0])
+        self.assertEqual(['platform_fee'], list(response.data[1]))
+
     def test_list_listing(self):
         """
         Ensure we can list listings.
@@ -78,7 +121,7 @@ class ListingTests(APITestCase):
         url = reverse('api:v1:listings:listing-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
         self.assertEqual(
             [
@@ -119,7 +162,55 @@ class ListingTests(APITestCase):
                     },
                 }
             ],
-            json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)),
+            json.loads(json.dumps(response.data['results'], cls=DjangoJSONEncoder)),
+        )
+
+    def test_filter_listings(self):
+        """
+        Ensure listings can be filtered by platform and property.
+        """
+        property2 = Property.objects.create(
+            code='property2',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        listing1 = Listing.objects.create(platform='Airbnb', platform_fee=5.0, property=self.property)
+        listing2 = Listing.objects.create(platform='Cloudbeds', platform_fee=4.0, property=self.property)
+        listing3 = Listing.objects.create(platform='Airbnb', platform_fee=5.0, property=property2)
+
+        url = reverse('api:v1:listings:listing-list')
+        for params, expected in (
+            ({'platform': 'Airbnb'}, [listing3, listing1]),
+            ({'property': self.property.id}, [listing2, listing1]),
+            ({'platform': 'Airbnb', 'property': property2.id}, [listing3]),
+            ({'platform': 'Booking'}, []),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [str(listing.id) for listing in expected],
+                [item['id'] for item in response.data['results']],
+                params,
+            )
+
+    def test_list_listing_without_expansion(self):
+        """
+        Ensure listings can be returned with the property id only.
+        """
+        listing = Listing.objects.create(
+            platform='Airbnb',
+            platform_fee=5.0,
+            property=self.property,
+        )
+
+        url = reverse('api:v1:listings:listing-list')
+        response = self.client.get(url, {'fields': 'id,property', 'expand': ''})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [{'id': str(listing.id), 'property': str(self.property.id)}],
+            json.loads(json.dumps(response.data['results'], cls=DjangoJSONEncoder)),
         )
 
     def test_retrieve_listing(self):
@@ -202,6 +293,84 @@ class ListingTests(APITestCase):
             },
         }, json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)))
 
+    def test_update_listing_fees_by_filter(self):
+        """
+        Ensure one fee can be set on every listing of a platform at once.
+        """
+        airbnb = Listing.objects.create(platform='Airbnb', platform_fee=4.0, property=self.property)
+        current = Listing.objects.create(platform='Airbnb', platform_fee=6.0, property=self.property)
+        other = Listing.objects.create(platform='Cloudbeds', platform_fee=4.0, property=self.property)
+        updated_at = airbnb.updated_at
+
+        url = reverse('api:v1:listings:listing-fees') + '?platform=Airbnb'
+        with self.assertNumQueries(4):
+            response = self.client.patch(url, {'platform_fee': '6.00', 'return_ids': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({'updated': 1, 'ids': [airbnb.id]}, response.data)
+
+        airbnb.refresh_from_db()
+        current.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual('6.00', str(airbnb.platform_fee))
+        self.assertGreater(airbnb.updated_at, updated_at)
+        self.assertEqual('6.00', str(current.platform_fee))
+        self.assertEqual('4.00', str(other.platform_fee))
+
+        response = self.client.get(reverse('api:v1:listings:listing-detail', kwargs={'pk': airbnb.id}))
+        self.assertEqual('6.00', response.data['platform_fee'])
+
+    def test_update_listing_fees_single_update(self):
+        """
+        Ensure one fee is set with a single UPDATE whatever the number of listings.
+        """
+        Listing.objects.bulk_create([
+            Listing(platform='Airbnb', platform_fee=4.0, property=self.property) for _ in range(600)
+        ])
+        expected = set(Listing.objects.values_list('pk', flat=True))
+        for can_return in (True, False):
+            with self.subTest(can_return=can_return), \
+                    mock.patch.object(connection.features, 'can_return_columns_from_insert', can_return), \
+                    CaptureQueriesContext(connection) as context:
+                fee = 5.0 if can_return else 6.0
+                updated = Listing.objects.filter(platform='Airbnb').set_platform_fees(fee)
+            self.assertEqual(expected, set(updated))
+            self.assertEqual(600, Listing.objects.filter(platform_fee=fee).count())
+            self.assertEqual(1, sum(query['sql'].startswith('UPDATE') for query in context.captured_queries))
+
+    def test_update_listing_fees_by_id(self):
+        """
+        Ensure fees can be set per listing at once.
+        """
+        listings = [
+            Listing.objects.create(platform='Airbnb', platform_fee=4.0, property=self.property)
+            for _ in range(3)
+        ]
+        data = {'items': [
+            {'id': listings[0].id, 'platform_fee': '5.00'},
+            {'id': listings[1].id, 'platform_fee': '7.50'},
+        ]}
+        url = reverse('api:v1:listings:listing-fees')
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({'updated': 2}, response.data)
+        self.assertEqual(
+            ['5.00', '7.50', '4.00'],
+            [str(Listing.objects.get(pk=listing.pk).platform_fee) for listing in listings],
+        )
+
+    def test_update_listing_fees_requires_filter(self):
+        """
+        Ensure setting one fee without filter does not change every listing.
+        """
+        Listing.objects.create(platform='Airbnb', platform_fee=4.0, property=self.property)
+        url = reverse('api:v1:listings:listing-fees')
+
+        response = self.client.patch(url, {'platform_fee': '6.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual('4.00', str(Listing.objects.get().platform_fee))
+
     def test_delete_listing(self):
         """
         Ensure we can't delete a listing.
@@ -216,3 +385,158 @@ class ListingTests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
         self.assertEqual(Listing.objects.count(), 1)
+
+    def test_retrieve_not_modified_since(self):
+        """
+        Ensure Last-Modified of a listing is the latest update of the listing and its property.
+        """
+        listing = Listing.objects.create(platform='Airbnb', platform_fee=4.0, property=self.property)
+        updated_at = listing.updated_at - datetime.timedelta(hours=1)
+        Listing.objects.filter(pk=listing.pk).update(updated_at=updated_at - datetime.timedelta(hours=1))
+        Property.objects.filter(pk=self.property.pk).update(updated_at=updated_at)
+        url = reverse('api:v1:listings:listing-detail', kwargs={'pk': listing.id})
+        response = self.client.get(url)
+        self.assertEqual(http_date(int(updated_at.timestamp())), response['Last-Modified'])
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # The listing loses its property without being saved.
+        self.property.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(int(updated_at.timestamp())))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['property'])
+
+    def test_list_not_modified_after_related_delete(self):
+        """
+        Ensure the collection ETag changes when a property that is not the latest is deleted.
+        """
+        Listing.objects.bulk_create([
+            Listing(platform='Airbnb', platform_fee=4.0, property=self.property) for _ in range(30)
+        ])
+        other = Property.objects.create(
+            code='property2',
+            guest_limit=3,
+            bathrooms=1,
+            accept_pets=True,
+            cleaning_price=10.0,
+        )
+        Listing.objects.create(platform='Booking', platform_fee=3.0, property=other)
+        url = reverse('api:v1:listings:listing-list')
+        etag = self.client.get(url, {'page_size': 100})['ETag']
+
+        self.property.delete()
+        response = self.client.get(url, {'page_size': 100}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(etag, response['ETag'])
+        self.assertEqual(30, sum(item['property'] is None for item in response.data['results']))
+
+
+class ListingQueryCountTests(APITestCase):
+
+    def create_listings(self, count):
+        for _ in range(count):
+            property = Property.objects.create(
+                code='property{}'.format(Property.objects.count()),
+                guest_limit=5,
+                bathrooms=2,
+                accept_pets=False,
+                cleaning_price=20.0,
+            )
+            Listing.objects.create(
+                platform='Airbnb',
+                platform_fee=5.0,
+                property=property,
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_list_listing_query_count_is_constant(self):
+        """
+        Ensure listing listings does not issue one query per row.
+        """
+        url = reverse('api:v1:listings:listing-list')
+        self.create_listings(1)
+        expected = self.count_queries(url)
+        self.create_listings(10)
+        self.assertEqual(expected, self.count_queries(url))
+
+    def test_retrieve_listing_query_count(self):
+        """
+        Ensure retrieving a listing fetches its property in the same query.
+        """
+        self.create_listings(1)
+        listing = Listing.objects.get()
+        url = reverse('api:v1:listings:listing-detail', kwargs={'pk': listing.id})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ListingAsyncReadTests(APITestCase):
+
+    def setUp(self):
+        property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        for platform in ('Airbnb', 'Booking', 'Cloudbeds'):
+            Listing.objects.create(platform=platform, platform_fee=5.0, property=property)
+
+    def get_expected(self, name, params=None, **kwargs):
+        response = self.client.get(reverse('api:v1:listings:listing-' + name, kwargs=kwargs), params)
+        # Pagination links point to the endpoint they were generated by.
+        return response.status_code, json.loads(
+            response.content.decode().replace('/listings/', '/async/listings/'))
+
+    def assertSameResponse(self, name, params=None, **kwargs):
+        status_code, expected = self.get_expected(name, params, **kwargs)
+        url = reverse('api:v1:listings:listing-async-' + name, kwargs=kwargs)
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status_code)
+        self.assertEqual(response.json(), expected)
+        return response
+
+    def test_list(self):
+        """
+        Ensure the async list returns the same pages as the sync list.
+        """
+        response = self.assertSameResponse('list', {'page_size': 2})
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertSameResponse('list', {'platform': 'Booking', 'fields': 'id,property.code'})
+
+    def test_retrieve(self):
+        listing = Listing.objects.first()
+        self.assertSameResponse('detail', pk=listing.id)
+        self.assertSameResponse('detail', {'expand': ''}, pk=listing.id)
+        response = self.assertSameResponse('detail', pk='00000000-0000-0000-0000-000000000000')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }, 'api': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'api_cache',
+    }})
+    async def test_database_cache(self):
+        """
+        Ensure serializers do not query the cache from the event loop.
+        """
+        await sync_to_async(call_command)('createcachetable', verbosity=0)
+        listing = await Listing.objects.afirst()
+        for name, kwargs in (('list', {}), ('detail', {'pk': listing.id})):
+            # Twice to read the representations cached by the first request.
+            for _ in range(2):
+                status_code, expected = await sync_to_async(self.get_expected)(name, **kwargs)
+                url = reverse('api:v1:listings:listing-async-' + name, kwargs=kwargs)
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, status_code)
+                self.assertEqual(response.json(), expected)
@@ -1,10 +1,15 @@
 from rest_framework import routers
 
-from .views import ListingViewSet
+from django.urls import path
+
+from .views import ListingAsyncReadView, ListingViewSet
 
 app_name = 'listings_api_v1'
 
 router = routers.SimpleRouter()
 router.register(r'listings', ListingViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('async/listings/', ListingAsyncReadView.as_view(), name='listing-async-list'),
+    path('async/listings/<uuid:pk>/', ListingAsyncReadView.as_view(), name='listing-async-detail'),
+]
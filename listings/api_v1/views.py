@@ -1,14 +1,56 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
-from .serializers import ListingReadSerializer, ListingSerializer
+from django.db import transaction
+
+from api.async_views import AsyncReadView
+from api.mixins import BulkCreateModelMixin, ConditionalRequestMixin, DynamicFieldsViewMixin
+
+from .serializers import ListingFeeUpdateSerializer, ListingReadSerializer, ListingSerializer
 from ..models import Listing
 
 
-class ListingViewSet(viewsets.ModelViewSet):
-    queryset = Listing.objects.all()
+class ListingViewSet(BulkCreateModelMixin, ConditionalRequestMixin,
+                     DynamicFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Listing.objects.select_related('property')
+    expandable_relations = ('property',)
     http_method_names = ['get', 'post', 'head', 'put', 'patch']
+    filter_fields = {
+        'platform': 'platform',
+        'property': 'property',
+    }
 
     def get_serializer_class(self):
         if hasattr(self, 'action') and self.action in ('list', 'retrieve'):
              return ListingReadSerializer
+        if hasattr(self, 'action') and self.action == 'fees':
+            return ListingFeeUpdateSerializer
         return ListingSerializer
+
+    @action(detail=False, methods=['patch'])
+    def fees(self, request):
+        """Change the platform fee of many listings at once.
+
+        Listings are filtered with the same query parameters as the list,
+        a filter is required when setting one fee for all of them. Rows are
+        updated in one transaction without loading or serializing them.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fees = serializer.get_fees()
+        if not isinstance(fees, dict) and not any(request.query_params.get(param) for param in self.filter_fields):
+            raise ValidationError({'platform_fee': 'Filter the listings to update, e.g. with `?platform=`.'})
+
+        queryset = self.filter_queryset(Listing.objects.all())
+        with transaction.atomic():
+            updated = queryset.set_platform_fees(fees)
+        data = {'updated': len(updated)}
+        if serializer.validated_data['return_ids']:
+            data['ids'] = updated
+        return Response(data)
+
+
+class ListingAsyncReadView(AsyncReadView):
+    viewset_class = ListingViewSet
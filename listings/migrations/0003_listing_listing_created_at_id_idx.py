@@ -0,0 +1,17 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0002_alter_listing_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['-created_at', '-id'], name='listing_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0003_listing_listing_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['platform', '-created_at', '-id'], name='listing_platform_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['property', '-created_at', '-id'], name='listing_property_created_idx'),
+        ),
+    ]
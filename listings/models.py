@@ -1,8 +1,79 @@
 import uuid
+from collections import defaultdict
 
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from api.signals import post_bulk_update
+
+
+class ListingQuerySet(models.QuerySet):
+
+    update_batch_size = 500
+
+    def set_platform_fees(self, fees):
+        """Set the platform fee of the listings with set-based `UPDATE` queries.
+
+        `fees` is either one fee for every listing of the queryset, set with
+        a single `UPDATE`, or a mapping of listing id to fee, one `UPDATE` per
+        fee and batch of ids. Listings already at their fee are not touched.
+        `post_bulk_update` is sent and the updated ids returned.
+        """
+        if isinstance(fees, dict):
+            ids_by_fee = defaultdict(list)
+            for pk, fee in fees.items():
+                ids_by_fee[fee].append(pk)
+        else:
+            ids_by_fee = {fees: None}
+
+        updated_at = timezone.now()
+        updated = []
+        for fee, pks in ids_by_fee.items():
+            queryset = self.exclude(platform_fee=fee).order_by()
+            if pks is None:
+                updated.extend(queryset.update_returning_pks(platform_fee=fee, updated_at=updated_at))
+                continue
+            for start in range(0, len(pks), self.update_batch_size):
+                updated.extend(queryset.filter(pk__in=pks[start:start + self.update_batch_size])
+                               .update_returning_pks(platform_fee=fee, updated_at=updated_at))
+
+        post_bulk_update.send(sender=self.model, pks=updated)
+        return updated
+
+    def update_returning_pks(self, **values):
+        """Like `update()` but return the primary keys of the updated rows.
+
+        One `UPDATE ... RETURNING` where the database supports it
+        (PostgreSQL, SQLite 3.35+). Elsewhere the rows are locked and their
+        keys read before the `UPDATE`.
+        """
+        using = self._db or router.db_for_write(self.model)
+        connection = connections[using]
+        if not connection.features.can_return_columns_from_insert:
+            with transaction.atomic(using=using, savepoint=False):
+                pks = list(self.using(using).select_for_update().values_list('pk', flat=True))
+                self.using(using).update(**values)
+            return pks
+
+        opts = self.model._meta
+        quote_name = connection.ops.quote_name
+        assignments, params = [], []
+        for name, value in values.items():
+            field = opts.get_field(name)
+            assignments.append('{} = %s'.format(quote_name(field.column)))
+            params.append(field.get_db_prep_save(value, connection))
+        subquery, subquery_params = self.using(using).values('pk').query.sql_with_params()
+        sql = 'UPDATE {table} SET {assignments} WHERE {pk} IN ({subquery}) RETURNING {pk}'.format(
+            table=quote_name(opts.db_table),
+            assignments=', '.join(assignments),
+            pk=quote_name(opts.pk.column),
+            subquery=subquery,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + list(subquery_params))
+            return [opts.pk.to_python(row[0]) for row in cursor.fetchall()]
+
 
 class Listing(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -16,10 +87,18 @@ class Listing(models.Model):
         'properties.Property', on_delete=models.SET_NULL, null=True,
         verbose_name=_('Property'))
 
+    objects = ListingQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Listing')
         verbose_name_plural = _('Listings')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='listing_created_at_id_idx'),
+            models.Index(fields=['updated_at'], name='listing_updated_at_idx'),
+            models.Index(fields=['platform', '-created_at', '-id'], name='listing_platform_created_idx'),
+            models.Index(fields=['property', '-created_at', '-id'], name='listing_property_created_idx'),
+        ]
 
     def __str__(self):
         if not self.property:
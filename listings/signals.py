@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api import cache
+from api.signals import post_bulk_update
+from properties.models import Property
+
+from .models import Listing
+
+
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+def invalidate_cache(sender, instance, **kwargs):
+    cache.invalidate(Listing, [instance.pk])
+
+
+@receiver(post_bulk_update, sender=Listing)
+def invalidate_bulk_cache(sender, pks, **kwargs):
+    cache.invalidate(Listing, pks)
+
+
+@receiver(post_save, sender=Property)
+@receiver(pre_delete, sender=Property)
+def invalidate_property_listings_cache(sender, instance, **kwargs):
+    """Listings embed their property, drop them when it changes."""
+    listings = Listing.objects.filter(property=instance.pk).values_list('pk', flat=True)
+    cache.invalidate(Listing, listings)
+
+
+@receiver(pre_delete, sender=Property)
+def touch_property_listings(sender, instance, using, **kwargs):
+    """Listings of a deleted property lose their property without a save, date the change."""
+    Listing.objects.using(using).filter(property=instance.pk).update(updated_at=timezone.now())
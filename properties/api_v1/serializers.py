@@ -1,9 +1,13 @@
 from rest_framework import serializers
 
+from api.serializers import (
+    CachedRepresentationMixin, DynamicFieldsMixin, FastRepresentationMixin, TimedRepresentationMixin)
+
 from ..models import Property
 
 
-class PropertySerializer(serializers.ModelSerializer):
+class PropertySerializer(TimedRepresentationMixin, CachedRepresentationMixin, DynamicFieldsMixin,
+                         FastRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Property
         fields = '__all__'
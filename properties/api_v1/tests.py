@@ -1,11 +1,18 @@
 import json
 import datetime
 
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import override_settings
 from django.urls import reverse
 
+from listings.models import Listing
+from reservations.models import Occupancy, Reservation
+
 from ..models import Property
 
 
@@ -68,7 +75,7 @@ class PropertyTests(APITestCase):
         url = reverse('api:v1:properties:property-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
         self.assertEqual(
             [
@@ -96,7 +103,7 @@ class PropertyTests(APITestCase):
                 },
 
             ],
-            json.loads(json.dumps(response.data)),
+            json.loads(json.dumps(response.data['results'])),
         )
 
     def test_retrieve_property(self):
@@ -181,3 +188,256 @@ class PropertyTests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Property.objects.count(), 0)
+
+
+class PropertyConditionalTests(APITestCase):
+
+    def setUp(self):
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+
+    def test_retrieve_not_modified(self):
+        """
+        Ensure a property is not sent again when it did not change.
+        """
+        url = reverse('api:v1:properties:property-detail', kwargs={'pk': self.property.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(etag, response['ETag'])
+        self.assertEqual(b'', response.content)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.property.bathrooms = 3
+        self.property.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(etag, response['ETag'])
+
+        response = self.client.get(url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_not_modified(self):
+        """
+        Ensure a collection is not sent again when it did not change.
+        """
+        url = reverse('api:v1:properties:property-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Timestamps do not see deletes, only the ETag validates collections.
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Sun, 01 Jan 2040 00:00:00 GMT')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        property = Property.objects.create(
+            code='property2',
+            guest_limit=3,
+            bathrooms=1,
+            accept_pets=True,
+            cleaning_price=10.0,
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        property.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class PropertyAvailabilityTests(APITestCase):
+
+    def setUp(self):
+        self.property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        self.listing = Listing.objects.create(
+            platform='Airbnb',
+            platform_fee=5.0,
+            property=self.property,
+        )
+        self.url = reverse('api:v1:properties:property-availability', kwargs={'pk': self.property.id})
+
+    def create_reservation(self, check_in, check_out):
+        return Reservation.objects.create(
+            check_in=check_in,
+            check_out=check_out,
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+
+    def test_availability(self):
+        """
+        Ensure booked nights are returned without reading reservations.
+        """
+        self.create_reservation(datetime.date(2023, 12, 30), datetime.date(2024, 1, 2))
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'from': '2023-12-25', 'to': '2024-01-05'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({
+            'property': str(self.property.id),
+            'from': '2023-12-25',
+            'to': '2024-01-05',
+            'available': False,
+            'booked': ['2023-12-30', '2023-12-31', '2024-01-01'],
+        }, json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)))
+
+        response = self.client.get(self.url, {'from': '2024-01-02', 'to': '2024-01-05'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['available'])
+        self.assertEqual([], response.data['booked'])
+
+    def test_availability_after_delete(self):
+        """
+        Ensure nights are released when a reservation is deleted.
+        """
+        self.create_reservation(datetime.date(2023, 1, 6), datetime.date(2023, 1, 8))
+        reservation = self.create_reservation(datetime.date(2023, 1, 8), datetime.date(2023, 1, 10))
+        reservation.delete()
+
+        response = self.client.get(self.url, {'from': '2023-01-01', 'to': '2023-02-01'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [datetime.date(2023, 1, 6), datetime.date(2023, 1, 7)],
+            response.data['booked'],
+        )
+
+    def get_booked(self, property):
+        url = reverse('api:v1:properties:property-availability', kwargs={'pk': property.id})
+        response = self.client.get(url, {'from': '2023-01-01', 'to': '2023-02-01'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['booked']
+
+    def test_availability_after_move(self):
+        """
+        Ensure nights follow reservations moved to another property.
+        """
+        other = Property.objects.create(
+            code='property2',
+            guest_limit=3,
+            bathrooms=1,
+            accept_pets=True,
+            cleaning_price=10.0,
+        )
+        other_listing = Listing.objects.create(platform='Booking', platform_fee=3.0, property=other)
+        reservation = self.create_reservation(datetime.date(2023, 1, 6), datetime.date(2023, 1, 7))
+        nights = [datetime.date(2023, 1, 6)]
+
+        url = reverse('api:v1:listings:listing-detail', kwargs={'pk': self.listing.id})
+        response = self.client.patch(url, {'property': str(other.id)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([], self.get_booked(self.property))
+        self.assertEqual(nights, self.get_booked(other))
+
+        reservation.listing = Listing.objects.create(
+            platform='Airbnb', platform_fee=5.0, property=self.property)
+        reservation.save()
+        self.assertEqual(nights, self.get_booked(self.property))
+        self.assertEqual([], self.get_booked(other))
+
+        reservation.listing.delete()
+        self.assertEqual([], self.get_booked(self.property))
+
+        reservation.listing = other_listing
+        reservation.save()
+        other.delete()
+        self.assertFalse(Occupancy.objects.exists())
+
+    def test_availability_invalid_range(self):
+        """
+        Ensure the date range is validated.
+        """
+        for params in (
+            {},
+            {'from': '2023-01-06'},
+            {'from': 'tomorrow', 'to': '2023-01-08'},
+            {'from': '2023-01-08', 'to': '2023-01-06'},
+            {'from': '2023-01-01', 'to': '2026-01-01'},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PropertyAsyncReadTests(APITestCase):
+
+    def setUp(self):
+        for index in range(3):
+            Property.objects.create(
+                code='property{}'.format(index),
+                guest_limit=5,
+                bathrooms=2,
+                accept_pets=False,
+                cleaning_price=20.0,
+            )
+
+    def get_expected(self, name, params=None, **kwargs):
+        response = self.client.get(reverse('api:v1:properties:property-' + name, kwargs=kwargs), params)
+        # Pagination links point to the endpoint they were generated by.
+        return response.status_code, json.loads(
+            response.content.decode().replace('/properties/', '/async/properties/'))
+
+    def assertSameResponse(self, name, params=None, **kwargs):
+        status_code, expected = self.get_expected(name, params, **kwargs)
+        url = reverse('api:v1:properties:property-async-' + name, kwargs=kwargs)
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status_code)
+        self.assertEqual(response.json(), expected)
+        return response
+
+    def test_list(self):
+        """
+        Ensure the async list returns the same pages as the sync list.
+        """
+        response = self.assertSameResponse('list', {'page_size': 2})
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertSameResponse('list', {'fields': 'id,code'})
+
+    def test_retrieve(self):
+        property = Property.objects.first()
+        self.assertSameResponse('detail', pk=property.id)
+        response = self.assertSameResponse('detail', pk='00000000-0000-0000-0000-000000000000')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }, 'api': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'api_cache',
+    }})
+    async def test_database_cache(self):
+        """
+        Ensure serializers do not query the cache from the event loop.
+        """
+        await sync_to_async(call_command)('createcachetable', verbosity=0)
+        property = await Property.objects.afirst()
+        for name, kwargs in (('list', {}), ('detail', {'pk': property.id})):
+            # Twice to read the representations cached by the first request.
+            for _ in range(2):
+                status_code, expected = await sync_to_async(self.get_expected)(name, **kwargs)
+                url = reverse('api:v1:properties:property-async-' + name, kwargs=kwargs)
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, status_code)
+                self.assertEqual(response.json(), expected)
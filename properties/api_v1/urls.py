@@ -1,10 +1,15 @@
 from rest_framework import routers
 
-from .views import PropertyViewSet
+from django.urls import path
+
+from .views import PropertyAsyncReadView, PropertyViewSet
 
 app_name = 'properties_api_v1'
 
 router = routers.SimpleRouter()
 router.register(r'properties', PropertyViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('async/properties/', PropertyAsyncReadView.as_view(), name='property-async-list'),
+    path('async/properties/<uuid:pk>/', PropertyAsyncReadView.as_view(), name='property-async-detail'),
+]
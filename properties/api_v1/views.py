@@ -1,9 +1,63 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from django.utils.dateparse import parse_date
+
+from api.async_views import AsyncReadView
+from api.mixins import ConditionalRequestMixin, DynamicFieldsViewMixin
+from reservations.occupancy import booked_nights
 
 from .serializers import PropertySerializer
 from ..models import Property
 
+MAX_AVAILABILITY_DAYS = 731
+
 
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyViewSet(ConditionalRequestMixin, DynamicFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = PropertySerializer
     queryset = Property.objects.all()
+
+    @action(detail=True)
+    def availability(self, request, pk=None):
+        """Return the booked nights of a property between `from` and `to`.
+
+        `to` is exclusive, e.g. `?from=2023-01-06&to=2023-01-08` checks the
+        nights of January 6th and 7th. Reservations are not read, the answer
+        comes from the property occupancy bitmaps.
+        """
+        start = self.get_date_param('from')
+        end = self.get_date_param('to')
+        if end <= start:
+            raise ValidationError({'to': 'Must be after from date.'})
+        if (end - start).days > MAX_AVAILABILITY_DAYS:
+            raise ValidationError({
+                'to': 'Range can not be longer than {} days.'.format(MAX_AVAILABILITY_DAYS),
+            })
+
+        property = self.get_object()
+        booked = booked_nights(property.pk, start, end)
+        return Response({
+            'property': property.pk,
+            'from': start,
+            'to': end,
+            'available': not booked,
+            'booked': booked,
+        })
+
+    def get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            raise ValidationError({name: 'This parameter is required.'})
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        if date is None:
+            raise ValidationError({name: 'Date has wrong format. Use YYYY-MM-DD.'})
+        return date
+
+
+class PropertyAsyncReadView(AsyncReadView):
+    viewset_class = PropertyViewSet
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_property_property_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['updated_at'], name='property_updated_at_idx'),
+        ),
+    ]
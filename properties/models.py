@@ -20,6 +20,10 @@ class Property(models.Model):
         verbose_name = _('Property')
         verbose_name_plural = _('Properties')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='property_created_at_id_idx'),
+            models.Index(fields=['updated_at'], name='property_updated_at_idx'),
+        ]
 
     def __str__(self):
         return self.code
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api import cache
+
+from .models import Property
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_cache(sender, instance, **kwargs):
+    cache.invalidate(Property, [instance.pk])
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import ReportView
+
+app_name = 'reports_api_v1'
+
+urlpatterns = [
+    path('reports/', ReportView.as_view(), name='report'),
+]
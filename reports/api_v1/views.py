@@ -0,0 +1,71 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from django.utils.dateparse import parse_date
+
+from .. import queries
+
+REVENUE_FIELD = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+class ReportView(APIView):
+
+    """Revenue and nights of reservations grouped by property, platform and month.
+
+    `?group_by=` takes a comma separated list of `property`, `platform` and
+    `month` (default `property`). `?from=` and `?to=` (exclusive) filter on
+    the check-in date. `?rollup=true` reads the materialized daily rollups,
+    which are as fresh as the last `refresh_report_rollups` run.
+    """
+
+    def get(self, request):
+        groups = self.get_groups()
+        start = self.get_date_param('from')
+        end = self.get_date_param('to')
+        if start and end and end <= start:
+            raise ValidationError({'to': 'Must be after from date.'})
+
+        if request.query_params.get('rollup') in ('1', 'true'):
+            rows = queries.from_rollups(groups, start, end)
+        else:
+            rows = queries.from_reservations(groups, start, end)
+
+        results = []
+        for row in rows:
+            if 'month' in row:
+                row['month'] = row['month'].strftime('%Y-%m')
+            row['revenue'] = REVENUE_FIELD.to_representation(row['revenue'] or 0)
+            results.append(row)
+        return Response({
+            'group_by': groups,
+            'from': start,
+            'to': end,
+            'results': results,
+        })
+
+    def get_groups(self):
+        value = self.request.query_params.get('group_by') or 'property'
+        groups = []
+        for name in value.split(','):
+            name = name.strip()
+            if name not in queries.GROUPS:
+                raise ValidationError({
+                    'group_by': 'Unknown group {!r}, use {}.'.format(name, ', '.join(queries.GROUPS)),
+                })
+            if name not in groups:
+                groups.append(name)
+        return groups
+
+    def get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        if date is None:
+            raise ValidationError({name: 'Date has wrong format. Use YYYY-MM-DD.'})
+        return date
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from reports import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily report rollups from the reservations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help='First check-in date to refresh (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='end', help='Check-in date to stop at, exclusive (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        start = self.parse(options['start'])
+        end = self.parse(options['end'])
+        count = rollups.refresh(start, end)
+        self.stdout.write(self.style.SUCCESS('{} rollups refreshed.'.format(count)))
+
+    def parse(self, value):
+        if value is None:
+            return None
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        if date is None:
+            raise CommandError('Date {!r} has wrong format. Use YYYY-MM-DD.'.format(value))
+        return date
@@ -0,0 +1,38 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('properties', '0004_property_updated_at_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('platform', models.CharField(blank=True, default='', max_length=50, verbose_name='Platform')),
+                ('reservations', models.PositiveIntegerField(verbose_name='Reservations')),
+                ('nights', models.PositiveIntegerField(verbose_name='Nights')),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Revenue')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, verbose_name='Refreshed at')),
+                ('property', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='properties.property', verbose_name='Property')),
+            ],
+            options={
+                'verbose_name': 'Daily rollup',
+                'verbose_name_plural': 'Daily rollups',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyrollup',
+            index=models.Index(fields=['date', 'property', 'platform'], name='rollup_date_property_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DailyRollup(models.Model):
+
+    """Reservations of a property on a platform grouped by check-in date.
+
+    Rows are materialized by `reports.rollups.refresh` so reports over long
+    ranges read one row per property, platform and day instead of every
+    reservation.
+    """
+
+    date = models.DateField(_('Date'))
+    platform = models.CharField(_('Platform'), max_length=50, blank=True, default='')
+    reservations = models.PositiveIntegerField(_('Reservations'))
+    nights = models.PositiveIntegerField(_('Nights'))
+    revenue = models.DecimalField(_('Revenue'), max_digits=15, decimal_places=2)
+    refreshed_at = models.DateTimeField(_('Refreshed at'), auto_now=True)
+
+    property = models.ForeignKey(
+        'properties.Property', on_delete=models.SET_NULL, null=True, related_name='+',
+        verbose_name=_('Property'))
+
+    class Meta:
+        verbose_name = _('Daily rollup')
+        verbose_name_plural = _('Daily rollups')
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['date', 'property', 'platform'], name='rollup_date_property_idx'),
+        ]
+
+    def __str__(self):
+        return '{} {} {}'.format(self.date, self.property_id, self.platform)
@@ -0,0 +1,87 @@
+"""Revenue and occupancy aggregates computed by the database.
+
+The revenue of a reservation is its price minus the platform fee of its
+listing plus the cleaning price of the property. Reservations are counted in
+the month of their check-in.
+"""
+
+from django.db.models import Count, DecimalField, DurationField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from reservations.models import Reservation
+
+from .models import DailyRollup
+
+GROUPS = ('property', 'platform', 'month')
+
+ZERO = Value(0, output_field=DecimalField(max_digits=15, decimal_places=2))
+
+RESERVATION_GROUPS = {
+    'property': F('listing__property'),
+    'platform': Coalesce(F('listing__platform'), Value('')),
+    'month': TruncMonth('check_in'),
+    'date': F('check_in'),
+}
+
+# `None` groups by the model field of the same name.
+ROLLUP_GROUPS = {
+    'property': None,
+    'platform': None,
+    'month': TruncMonth('date'),
+}
+
+
+def reservation_revenue():
+    return ExpressionWrapper(
+        F('price') - Coalesce(F('listing__platform_fee'), ZERO)
+        + Coalesce(F('listing__property__cleaning_price'), ZERO),
+        output_field=DecimalField(max_digits=15, decimal_places=2),
+    )
+
+
+def reservation_nights():
+    return ExpressionWrapper(F('check_out') - F('check_in'), output_field=DurationField())
+
+
+def group(queryset, groups, expressions, measures):
+    """Aggregate `queryset` by the `groups` names, ordered by them."""
+    keys = {name: expressions[name] for name in groups if expressions[name] is not None}
+    return (
+        queryset
+        .order_by()
+        .annotate(**keys)
+        .values(*groups)
+        .annotate(**measures)
+        .order_by(*groups)
+    )
+
+
+def from_reservations(groups, start=None, end=None):
+    """Aggregate reservations checking in between `start` and `end` (exclusive)."""
+    queryset = Reservation.objects.all()
+    if start is not None:
+        queryset = queryset.filter(check_in__gte=start)
+    if end is not None:
+        queryset = queryset.filter(check_in__lt=end)
+    rows = group(queryset, groups, RESERVATION_GROUPS, {
+        'reservations': Count('id'),
+        'nights': Sum(reservation_nights()),
+        'revenue': Sum(reservation_revenue()),
+    })
+    for row in rows.iterator():
+        row['nights'] = row['nights'].days if row['nights'] is not None else 0
+        yield row
+
+
+def from_rollups(groups, start=None, end=None):
+    """Same as `from_reservations` but read from the daily rollups."""
+    queryset = DailyRollup.objects.all()
+    if start is not None:
+        queryset = queryset.filter(date__gte=start)
+    if end is not None:
+        queryset = queryset.filter(date__lt=end)
+    return iter(group(queryset, groups, ROLLUP_GROUPS, {
+        'reservations': Sum('reservations'),
+        'nights': Sum('nights'),
+        'revenue': Sum('revenue'),
+    }))
@@ -0,0 +1,42 @@
+import itertools
+
+from django.db import transaction
+
+from . import queries
+from .models import DailyRollup
+
+BATCH_SIZE = 1000
+
+
+def refresh(start=None, end=None):
+    """Recompute the daily rollups of check-ins between `start` and `end`.
+
+    Rows of the range are replaced in a single transaction so readers never
+    see a partially refreshed range. Returns the number of rows written.
+    """
+    rollups = queries.from_reservations(['date', 'property', 'platform'], start, end)
+    count = 0
+    with transaction.atomic():
+        existing = DailyRollup.objects.all()
+        if start is not None:
+            existing = existing.filter(date__gte=start)
+        if end is not None:
+            existing = existing.filter(date__lt=end)
+        existing.delete()
+        while True:
+            batch = [
+                DailyRollup(
+                    date=row['date'],
+                    property_id=row['property'],
+                    platform=row['platform'],
+                    reservations=row['reservations'],
+                    nights=row['nights'],
+                    revenue=row['revenue'],
+                )
+                for row in itertools.islice(rollups, BATCH_SIZE)
+            ]
+            if not batch:
+                break
+            DailyRollup.objects.bulk_create(batch)
+            count += len(batch)
+    return count
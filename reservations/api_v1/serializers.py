@@ -1,27 +1,127 @@
+import bisect
+from collections import defaultdict
+
 from rest_framework import serializers
 
-from listings.api_v1.serializers import ListingSerializer
+from django.conf import settings
+from django.utils.functional import cached_property
+
+from api.serializers import (
+    BulkListSerializer, BulkSerializerMixin, DynamicFieldsMixin, FastRepresentationMixin,
+    TimedRepresentationMixin)
+from listings.api_v1.serializers import ListingReadSerializer, ListingSerializer
+from listings.models import Listing
+from properties.models import Property
 
 from ..models import Reservation
 
+OVERLAP_ERROR = 'The listing is already booked between these dates.'
+
+
+class ReservationSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+
+    """Serializer to use when creating a reservation.
+
+    Overlapping stays are rejected, either on the same listing or on all
+    listings of the same property (see `RESERVATION_OVERLAP_SCOPE` setting).
+    The listing (or property) row is locked while checking, so `validate`
+    must run inside a transaction to be race safe.
+    """
 
-class ReservationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reservation
         fields = '__all__'
+        list_serializer_class = BulkListSerializer
+
+    @cached_property
+    def read_serializer(self):
+        return ReservationReadSerializer(context=self.context)
 
     def to_representation(self, instance):
-        return ReservationReadSerializer().to_representation(instance)
+        return self.read_serializer.to_representation(instance)
 
     def validate(self, data):
         if data['check_in'] > data['check_out']:
             raise serializers.ValidationError({
                 'check_out': 'Check-out must be after check-in date.',
             })
+        # Items created in bulk are checked together in `validate_bulk`.
+        if not self.in_bulk and data.get('listing') is not None:
+            if self.get_overlapping(data).exists():
+                raise serializers.ValidationError({'check_in': OVERLAP_ERROR})
         return data
 
+    def get_overlap_scope(self, listing):
+        """Return the `(lookup, value)` reservations must not overlap in."""
+        if settings.RESERVATION_OVERLAP_SCOPE == 'property' and listing.property_id is not None:
+            return 'listing__property', listing.property_id
+        return 'listing', listing.pk
 
-class ReservationReadSerializer(serializers.ModelSerializer):
+    def get_overlapping(self, data):
+        lookup, value = self.get_overlap_scope(data['listing'])
+        self.lock_scopes(lookup, [value])
+        return Reservation.objects.overlapping(
+            data['check_in'], data['check_out']).filter(**{lookup: value})
+
+    def lock_scopes(self, lookup, values):
+        model = Property if lookup == 'listing__property' else Listing
+        list(model.objects.select_for_update().filter(pk__in=values).values_list('pk', flat=True))
+
+    def validate_bulk(self, items):
+        """Check the overlaps of a batch with one query per scope type.
+
+        Existing stays and the stays accepted so far are kept as sorted,
+        disjoint intervals per scope, so each item is checked with a bisect.
+        """
+        scopes = defaultdict(list)
+        for index, item in enumerate(items):
+            if item.get('listing') is not None:
+                scopes[self.get_overlap_scope(item['listing'])].append(index)
+        if not scopes:
+            return None
+
+        booked = defaultdict(lambda: ([], []))
+        values_by_lookup = defaultdict(list)
+        for lookup, value in scopes:
+            values_by_lookup[lookup].append(value)
+        check_in = min(item['check_in'] for item in items)
+        check_out = max(item['check_out'] for item in items)
+        for lookup, values in values_by_lookup.items():
+            self.lock_scopes(lookup, values)
+            stays = (
+                Reservation.objects
+                .overlapping(check_in, check_out)
+                .filter(**{lookup + '__in': values})
+                .order_by('check_in')
+                .values_list(lookup, 'check_in', 'check_out')
+            )
+            for value, start, end in stays:
+                starts, ends = booked[lookup, value]
+                if start == end:
+                    continue
+                if ends and start < ends[-1]:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+
+        errors = [{} for _ in items]
+        for scope, indexes in scopes.items():
+            starts, ends = booked[scope]
+            for index in indexes:
+                start, end = items[index]['check_in'], items[index]['check_out']
+                position = bisect.bisect_left(starts, end)
+                if position and ends[position - 1] > start:
+                    errors[index] = {'check_in': [OVERLAP_ERROR]}
+                elif start < end:
+                    position = bisect.bisect_left(starts, start)
+                    starts.insert(position, start)
+                    ends.insert(position, end)
+        return errors
+
+
+class ReservationReadSerializer(TimedRepresentationMixin, DynamicFieldsMixin, FastRepresentationMixin,
+                                serializers.ModelSerializer):
 
     """Serializer to use when showing/returning a reservation.
 
@@ -33,6 +133,8 @@ class ReservationReadSerializer(serializers.ModelSerializer):
 
     listing = ListingSerializer(read_only=True)
 
+    expandable_fields = {'listing': ListingReadSerializer}
+
     class Meta:
         model = Reservation
         fields = '__all__'
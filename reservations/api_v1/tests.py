@@ -5,6 +5,9 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from listings.models import Listing
@@ -104,6 +107,192 @@ class ReservationTests(APITestCase):
             'check_out': ['Check-out must be after check-in date.'],
         }, json.loads(json.dumps(response.data)))
 
+    def test_create_overlapping_reservation(self):
+        """
+        Ensure we can't book a listing twice for the same nights.
+        """
+        Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 9),
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+
+        data = {
+            'check_in': '2023-01-08',
+            'check_out': '2023-01-10',
+            'price': '50.00',
+            'total_guests': 2,
+            'listing': self.listing.id,
+        }
+        url = reverse('api:v1:reservations:reservation-list')
+        response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual({
+            'check_in': ['The listing is already booked between these dates.'],
+        }, json.loads(json.dumps(response.data)))
+
+    def test_create_adjacent_reservations(self):
+        """
+        Ensure a stay can start on the day the previous one checks out.
+        """
+        Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 9),
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+        other_listing = Listing.objects.create(
+            platform='Cloudbeds',
+            platform_fee=4.0,
+            property=self.property,
+        )
+
+        url = reverse('api:v1:reservations:reservation-list')
+        for listing, check_in, check_out in (
+            (self.listing, '2023-01-09', '2023-01-10'),
+            (self.listing, '2023-01-05', '2023-01-06'),
+            (other_listing, '2023-01-06', '2023-01-09'),
+        ):
+            response = self.client.post(url, {
+                'check_in': check_in,
+                'check_out': check_out,
+                'price': '50.00',
+                'total_guests': 2,
+                'listing': listing.id,
+            })
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 4)
+
+    @override_settings(RESERVATION_OVERLAP_SCOPE='property')
+    def test_create_overlapping_reservation_on_property(self):
+        """
+        Ensure we can't book two listings of the same property for the same nights.
+        """
+        Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 9),
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+        other_listing = Listing.objects.create(
+            platform='Cloudbeds',
+            platform_fee=4.0,
+            property=self.property,
+        )
+
+        url = reverse('api:v1:reservations:reservation-list')
+        response = self.client.post(url, {
+            'check_in': '2023-01-07',
+            'check_out': '2023-01-08',
+            'price': '50.00',
+            'total_guests': 2,
+            'listing': other_listing.id,
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_bulk_create_reservations(self):
+        """
+        Ensure we can create many reservations with one request.
+        """
+        data = [
+            {
+                'check_in': '2023-01-{:02d}'.format(day),
+                'check_out': '2023-01-{:02d}'.format(day + 1),
+                'price': '50.00',
+                'total_guests': 2,
+                'listing': str(self.listing.id),
+            }
+            for day in range(1, 11)
+        ]
+        url = reverse('api:v1:reservations:reservation-bulk')
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 10)
+        self.assertCountEqual(
+            [
+                {'id': str(reservation.id), 'code': reservation.code}
+                for reservation in Reservation.objects.all()
+            ],
+            json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)),
+        )
+
+        response = self.client.get(
+            reverse('api:v1:properties:property-availability', kwargs={'pk': self.property.id}),
+            {'from': '2023-01-01', 'to': '2023-01-12'},
+        )
+        self.assertEqual(10, len(response.data['booked']))
+
+    def test_bulk_create_reservations_ndjson(self):
+        """
+        Ensure reservations can be created in bulk from newline delimited JSON.
+        """
+        lines = [
+            json.dumps({
+                'check_in': '2023-01-{:02d}'.format(day),
+                'check_out': '2023-01-{:02d}'.format(day + 1),
+                'price': '50.00',
+                'total_guests': 2,
+                'listing': str(self.listing.id),
+            })
+            for day in range(1, 4)
+        ]
+        url = reverse('api:v1:reservations:reservation-bulk')
+        response = self.client.post(url, '\n'.join(lines), content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 3)
+
+    def test_bulk_create_reservations_with_errors(self):
+        """
+        Ensure nothing is created and errors are returned per item when an item is invalid.
+        """
+        Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 9),
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+        item = {'price': '50.00', 'total_guests': 2, 'listing': str(self.listing.id)}
+        data = [
+            dict(item, check_in='2023-01-01', check_out='2023-01-03'),
+            dict(item, check_in='2023-01-08', check_out='2023-01-10'),
+            dict(item, check_in='2023-01-02', check_out='2023-01-04'),
+            dict(item, check_in='2023-01-09', check_out='2023-01-11'),
+        ]
+        url = reverse('api:v1:reservations:reservation-bulk')
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual([
+            {},
+            {'check_in': ['The listing is already booked between these dates.']},
+            {'check_in': ['The listing is already booked between these dates.']},
+            {},
+        ], json.loads(json.dumps(response.data)))
+
+        data = [
+            dict(item, check_in='2023-01-01', check_out='2023-01-03'),
+            dict(item, check_in='2023-01-03', check_out='2023-01-02'),
+            dict(item, check_in='2023-01-04', check_out='2023-01-05', listing='unknown'),
+        ]
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual({}, response.data[0])
+        self.assertEqual(['check_out'], list(response.data[1]))
+        self.assertEqual(['listing'], list(response.data[2]))
+
     def test_list_reservations(self):
         """
         Ensure we can list reservations.
@@ -128,7 +317,7 @@ class ReservationTests(APITestCase):
         url = reverse('api:v1:reservations:reservation-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
         self.assertEqual(
             [
@@ -191,9 +380,126 @@ class ReservationTests(APITestCase):
                     },
                 },
             ],
-            json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)),
+            json.loads(json.dumps(response.data['results'], cls=DjangoJSONEncoder)),
+        )
+
+    def test_list_reservations_paginated(self):
+        """
+        Ensure reservations are paginated with a stable cursor.
+        """
+        for day in range(1, 6):
+            Reservation.objects.create(
+                check_in=datetime.date(2023, 1, day),
+                check_out=datetime.date(2023, 1, day + 1),
+                price=50.0,
+                total_guests=1,
+                listing=self.listing,
+            )
+
+        url = reverse('api:v1:reservations:reservation-list')
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['previous'])
+
+        ids = []
+        while True:
+            ids.extend(item['id'] for item in response.data['results'])
+            if response.data['next'] is None:
+                break
+            self.assertLessEqual(len(response.data['results']), 2)
+            response = self.client.get(response.data['next'])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        expected = Reservation.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        self.assertEqual([str(id) for id in expected], ids)
+
+    def test_export_reservations(self):
+        """
+        Ensure we can stream all reservations as newline delimited JSON.
+        """
+        for day in range(1, 4):
+            Reservation.objects.create(
+                check_in=datetime.date(2023, 1, day),
+                check_out=datetime.date(2023, 1, day + 1),
+                price=50.0,
+                total_guests=1,
+                listing=self.listing,
+            )
+
+        url = reverse('api:v1:reservations:reservation-export')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        listed = self.client.get(reverse('api:v1:reservations:reservation-list'))
+        self.assertEqual(
+            json.loads(json.dumps(listed.data['results'], cls=DjangoJSONEncoder)),
+            [json.loads(line) for line in lines],
         )
 
+    def test_filter_reservations(self):
+        """
+        Ensure reservations can be filtered by listing, property and dates.
+        """
+        other_property = Property.objects.create(
+            code='property2',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        other_listing = Listing.objects.create(
+            platform='Cloudbeds',
+            platform_fee=4.0,
+            property=other_property,
+        )
+        reservation1 = Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 8),
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+        reservation2 = Reservation.objects.create(
+            check_in=datetime.date(2023, 2, 6),
+            check_out=datetime.date(2023, 2, 8),
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+        reservation3 = Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 10),
+            check_out=datetime.date(2023, 1, 12),
+            price=50.0,
+            total_guests=1,
+            listing=other_listing,
+        )
+
+        url = reverse('api:v1:reservations:reservation-list')
+        for params, expected in (
+            ({'listing': self.listing.id}, [reservation2, reservation1]),
+            ({'property': other_property.id}, [reservation3]),
+            ({'check_in_after': '2023-01-07'}, [reservation3, reservation2]),
+            ({'check_in_after': '2023-01-07', 'check_in_before': '2023-01-31'}, [reservation3]),
+            ({'check_out_before': '2023-01-08'}, [reservation1]),
+            ({'check_out_after': '2023-02-08', 'listing': self.listing.id}, [reservation2]),
+            ({'created_after': reservation2.created_at.isoformat()}, [reservation3, reservation2]),
+            ({'created_before': reservation1.created_at.isoformat()}, [reservation1]),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [str(reservation.id) for reservation in expected],
+                [item['id'] for item in response.data['results']],
+                params,
+            )
+
+        response = self.client.get(url, {'check_in_after': 'yesterday', 'listing': 'unknown'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(['check_in_after', 'listing'], sorted(response.data))
+
     def test_retrieve_reservation(self):
         """
         Ensure we can retrieve a reservation by id.
@@ -241,6 +547,132 @@ class ReservationTests(APITestCase):
             },
         }, json.loads(json.dumps(response.data)))
 
+    def test_retrieve_reservation_by_code(self):
+        """
+        Ensure we can retrieve a reservation by its code.
+        """
+        reservation = Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 7),
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+
+        url = reverse('api:v1:reservations:reservation-by-code', kwargs={'code': reservation.code.lower()})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(str(reservation.id), response.data['id'])
+
+        url = reverse('api:v1:reservations:reservation-by-code', kwargs={'code': 'UNKNOWN'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reservation_code_is_stable(self):
+        """
+        Ensure the code is unique and does not change when the reservation is saved again.
+        """
+        reservations = [
+            Reservation.objects.create(
+                check_in=datetime.date(2023, 1, day),
+                check_out=datetime.date(2023, 1, day + 1),
+                price=50.0,
+                total_guests=1,
+                listing=self.listing,
+            )
+            for day in range(1, 6)
+        ]
+        self.assertEqual(5, len({reservation.code for reservation in reservations}))
+
+        reservation = reservations[0]
+        code = reservation.code
+        reservation.comments = 'Late check-in'
+        reservation.save()
+        reservation.refresh_from_db()
+        self.assertEqual(code, reservation.code)
+
+    def test_retrieve_reservation_sparse_fields(self):
+        """
+        Ensure clients can pick fields and nested relations.
+        """
+        reservation = Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 7),
+            price=50.0,
+            total_guests=1,
+            comments='Some comment...',
+            listing=self.listing,
+        )
+        url = reverse('api:v1:reservations:reservation-detail', kwargs={'pk': reservation.id})
+
+        for params, expected in (
+            ({'fields': 'id,check_in'}, {
+                'id': str(reservation.id),
+                'check_in': '2023-01-06',
+            }),
+            ({'fields': 'id,listing', 'expand': ''}, {
+                'id': str(reservation.id),
+                'listing': str(self.listing.id),
+            }),
+            ({'fields': 'id,listing.platform,listing.property', 'expand': 'listing'}, {
+                'id': str(reservation.id),
+                'listing': {
+                    'platform': self.listing.platform,
+                    'property': str(self.property.id),
+                },
+            }),
+            ({'fields': 'listing.property.code'}, {
+                'listing': {
+                    'property': {'code': self.property.code},
+                },
+            }),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(expected, json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)))
+
+        response = self.client.get(url, {'expand': ''})
+        self.assertEqual(self.listing.id, response.data['listing'])
+        self.assertEqual(
+            {'id', 'check_in', 'check_out', 'price', 'total_guests', 'comments', 'code',
+             'created_at', 'updated_at', 'listing'},
+            set(response.data),
+        )
+
+    def test_retrieve_reservation_not_modified(self):
+        """
+        Ensure the ETag of a reservation changes when its listing changes.
+        """
+        reservation = Reservation.objects.create(
+            check_in=datetime.date(2023, 1, 6),
+            check_out=datetime.date(2023, 1, 7),
+            price=50.0,
+            total_guests=1,
+            listing=self.listing,
+        )
+        url = reverse('api:v1:reservations:reservation-detail', kwargs={'pk': reservation.id})
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.property.code = 'property2'
+        self.property.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual('property2', response.data['listing']['property']['code'])
+
+        list_url = reverse('api:v1:reservations:reservation-list')
+        etag = self.client.get(list_url)['ETag']
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.listing.platform_fee = 10.0
+        self.listing.save()
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_update_reservation(self):
         """
         Ensure we can't update a reservation.
@@ -274,3 +706,161 @@ class ReservationTests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Reservation.objects.count(), 0)
+
+
+class ReservationQueryCountTests(APITestCase):
+
+    def create_reservations(self, count):
+        for _ in range(count):
+            property = Property.objects.create(
+                code='property{}'.format(Property.objects.count()),
+                guest_limit=5,
+                bathrooms=2,
+                accept_pets=False,
+                cleaning_price=20.0,
+            )
+            listing = Listing.objects.create(
+                platform='Airbnb',
+                platform_fee=5.0,
+                property=property,
+            )
+            Reservation.objects.create(
+                check_in=datetime.date(2023, 1, 6),
+                check_out=datetime.date(2023, 1, 7),
+                price=50.0,
+                total_guests=1,
+                listing=listing,
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_list_reservations_query_count_is_constant(self):
+        """
+        Ensure listing reservations does not issue queries per row.
+        """
+        url = reverse('api:v1:reservations:reservation-list')
+        self.create_reservations(1)
+        expected = self.count_queries(url)
+        self.create_reservations(10)
+        self.assertEqual(expected, self.count_queries(url))
+
+    def test_retrieve_reservation_query_count(self):
+        """
+        Ensure retrieving a reservation fetches its listing and property in the same query.
+        """
+        self.create_reservations(1)
+        reservation = Reservation.objects.get()
+        url = reverse('api:v1:reservations:reservation-detail', kwargs={'pk': reservation.id})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_reservations_without_expansion_does_not_join(self):
+        """
+        Ensure relations that are not expanded are not joined.
+        """
+        self.create_reservations(3)
+        url = reverse('api:v1:reservations:reservation-list')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'expand': ''})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for query in context.captured_queries:
+            self.assertNotIn('JOIN', query['sql'])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'expand': 'listing'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for query in context.captured_queries:
+            self.assertNotIn('properties_property', query['sql'])
+
+    def test_bulk_create_query_count_is_constant(self):
+        """
+        Ensure validating and creating reservations in bulk does not issue queries per row.
+        """
+        self.create_reservations(1)
+        listing = Listing.objects.get()
+        url = reverse('api:v1:reservations:reservation-bulk')
+
+        def count_queries(first_day, count):
+            data = [
+                {
+                    'check_in': str(datetime.date(2024, 1, 1) + datetime.timedelta(days=day)),
+                    'check_out': str(datetime.date(2024, 1, 2) + datetime.timedelta(days=day)),
+                    'price': '50.00',
+                    'total_guests': 2,
+                    'listing': str(listing.id),
+                }
+                for day in range(first_day, first_day + count)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(context.captured_queries)
+
+        count_queries(0, 2)
+        self.assertEqual(count_queries(10, 2), count_queries(100, 50))
+
+
+class ReservationAsyncReadTests(APITestCase):
+
+    def setUp(self):
+        property = Property.objects.create(
+            code='property1',
+            guest_limit=5,
+            bathrooms=2,
+            accept_pets=False,
+            cleaning_price=20.0,
+        )
+        listing = Listing.objects.create(
+            platform='Airbnb',
+            platform_fee=5.0,
+            property=property,
+        )
+        for day in range(1, 4):
+            Reservation.objects.create(
+                check_in=datetime.date(2023, 1, day),
+                check_out=datetime.date(2023, 1, day + 1),
+                price=50.0,
+                total_guests=1,
+                listing=listing,
+            )
+
+    def assertSameResponse(self, name, params=None, **kwargs):
+        sync = self.client.get(reverse('api:v1:reservations:reservation-' + name, kwargs=kwargs), params)
+        url = reverse('api:v1:reservations:reservation-async-' + name, kwargs=kwargs)
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, sync.status_code)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        # Pagination links point to the endpoint they were generated by.
+        expected = json.loads(sync.content.decode().replace('/reservations/', '/async/reservations/'))
+        self.assertEqual(response.json(), expected)
+        return response
+
+    def test_list(self):
+        """
+        Ensure the async list returns the same pages as the sync list.
+        """
+        response = self.assertSameResponse('list', {'page_size': 2})
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertSameResponse('list', {'page_size': 2, 'fields': 'id,listing.platform', 'expand': 'listing'})
+
+    def test_list_filters(self):
+        property = Property.objects.first()
+        self.assertSameResponse('list', {'property': str(property.id)})
+        response = self.assertSameResponse('list', {'check_in_after': 'tomorrow'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve(self):
+        reservation = Reservation.objects.first()
+        self.assertSameResponse('detail', pk=reservation.id)
+        self.assertSameResponse('detail', {'fields': 'code'}, pk=reservation.id)
+
+    def test_retrieve_not_found(self):
+        response = self.assertSameResponse('detail', pk='00000000-0000-0000-0000-000000000000')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,10 +1,15 @@
 from rest_framework import routers
 
-from .views import ReservationViewSet
+from django.urls import path
+
+from .views import ReservationAsyncReadView, ReservationViewSet
 
 app_name = 'reservations_api_v1'
 
 router = routers.SimpleRouter()
 router.register(r'reservations', ReservationViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('async/reservations/', ReservationAsyncReadView.as_view(), name='reservation-async-list'),
+    path('async/reservations/<uuid:pk>/', ReservationAsyncReadView.as_view(), name='reservation-async-detail'),
+]
@@ -1,14 +1,60 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from django.db import transaction
+
+from api.async_views import AsyncReadView
+from api.mixins import BulkCreateModelMixin, ConditionalRequestMixin, DynamicFieldsViewMixin
+from api.renderers import NDJSONRenderer
+from api.streaming import ndjson_response
 
 from .serializers import ReservationReadSerializer, ReservationSerializer
+from .. import codes
 from ..models import Reservation
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
-    queryset = Reservation.objects.all()
+class ReservationViewSet(BulkCreateModelMixin, ConditionalRequestMixin,
+                         DynamicFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Reservation.objects.select_related('listing__property')
+    bulk_result_fields = ('id', 'code')
+    filter_fields = {
+        'listing': 'listing',
+        'property': 'listing__property',
+        'check_in_after': 'check_in__gte',
+        'check_in_before': 'check_in__lte',
+        'check_out_after': 'check_out__gte',
+        'check_out_before': 'check_out__lte',
+        'created_after': 'created_at__gte',
+        'created_before': 'created_at__lte',
+    }
+    expandable_relations = ('listing', 'listing.property')
     http_method_names = ['get', 'post', 'head', 'delete']
 
     def get_serializer_class(self):
-        if hasattr(self, 'action') and self.action in ('list', 'retrieve'):
+        if hasattr(self, 'action') and self.action in ('list', 'retrieve', 'export', 'by_code'):
              return ReservationReadSerializer
         return ReservationSerializer
+
+    @transaction.atomic
+    def create(self, request, *args, **kwargs):
+        # Overlap validation locks the listing until the reservation is saved.
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, renderer_classes=[NDJSONRenderer])
+    def export(self, request):
+        """Stream every reservation as newline delimited JSON."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return ndjson_response(queryset, self.get_serializer())
+
+    @action(detail=False, url_path=r'by-code/(?P<code>[0-9A-Za-z]+)', url_name='by-code')
+    def by_code(self, request, code=None):
+        """Retrieve a reservation by the code quoted by the guest."""
+        reservation = get_object_or_404(self.get_queryset(), code=codes.normalize(code))
+        self.check_object_permissions(request, reservation)
+        return Response(self.get_serializer(reservation).data)
+
+
+class ReservationAsyncReadView(AsyncReadView):
+    viewset_class = ReservationViewSet
@@ -0,0 +1,84 @@
+"""Reservation codes.
+
+Codes are 8 characters of Crockford's base32 alphabet encoding a number taken
+from a database sequence. The number is scrambled with a bijection of the
+40 bit space, so codes look random but two numbers never share a code and no
+retry is needed on insert.
+
+Each process reserves numbers in blocks so most inserts do not need any extra
+query. A block is only reused after the transaction that reserved it commits,
+so numbers reserved by a rolled back transaction are never handed out twice.
+"""
+
+import threading
+
+from django.db import transaction
+from django.db.models import F
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+LENGTH = 8
+BITS = 5 * LENGTH
+MASK = (1 << BITS) - 1
+MULTIPLIERS = (0x5DEECE66D, 0x9E3779B97)  # Odd, so invertible modulo 2 ** BITS.
+SEQUENCE_NAME = 'reservation_code'
+BLOCK_SIZE = 100
+
+# Legacy codes are hexadecimal and new codes never contain ambiguous
+# characters, so they can be normalized without clashing.
+NORMALIZE = str.maketrans({'O': '0', 'I': '1', 'L': '1'})
+
+_lock = threading.Lock()
+_block = iter(())
+
+
+def scramble(number):
+    for multiplier in MULTIPLIERS:
+        number = (number * multiplier) & MASK
+        number ^= number >> (BITS // 2)
+    return number
+
+
+def encode(number):
+    number = scramble(number)
+    chars = []
+    for _ in range(LENGTH):
+        number, index = divmod(number, 32)
+        chars.append(ALPHABET[index])
+    return ''.join(reversed(chars))
+
+
+def normalize(code):
+    return code.upper().translate(NORMALIZE)
+
+
+def reserve(count):
+    """Reserve `count` numbers of the sequence, return the first one."""
+    from .models import Sequence
+
+    with transaction.atomic():
+        updated = Sequence.objects.filter(name=SEQUENCE_NAME).update(value=F('value') + count)
+        if not updated:
+            Sequence.objects.create(name=SEQUENCE_NAME, value=count)
+        last = Sequence.objects.values_list('value', flat=True).get(name=SEQUENCE_NAME)
+    return last - count + 1
+
+
+def allocate(count):
+    """Return `count` new unique codes."""
+    global _block
+
+    with _lock:
+        numbers = [number for _, number in zip(range(count), _block)]
+    missing = count - len(numbers)
+    if missing:
+        size = max(missing, BLOCK_SIZE)
+        first = reserve(size)
+        numbers.extend(range(first, first + missing))
+        rest = range(first + missing, first + size)
+        if rest:
+            def keep():
+                global _block
+                with _lock:
+                    _block = iter(rest)
+            transaction.on_commit(keep)
+    return [encode(number) for number in numbers]
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from properties.models import Property
+from reservations import occupancy
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the occupancy bitmaps of every property from its reservations.'
+
+    def handle(self, *args, **options):
+        properties = Property.objects.order_by().values_list('pk', flat=True)
+        for property_id in properties.iterator():
+            occupancy.rebuild_property(property_id)
+        self.stdout.write(self.style.SUCCESS('Occupancy rebuilt.'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_reservation_reservation_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['listing', 'check_out', 'check_in'], name='reservation_listing_dates_idx'),
+        ),
+    ]
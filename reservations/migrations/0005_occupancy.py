@@ -0,0 +1,32 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_property_property_created_at_id_idx'),
+        ('reservations', '0004_reservation_reservation_listing_dates_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Occupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Year')),
+                ('days', models.BinaryField(max_length=46, verbose_name='Days')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancies', to='properties.property', verbose_name='Property')),
+            ],
+            options={
+                'verbose_name': 'Occupancy',
+                'verbose_name_plural': 'Occupancies',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='occupancy',
+            constraint=models.UniqueConstraint(fields=('property', 'year'), name='occupancy_property_year_unique'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:34
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Copy of `reservations.codes` as of this migration, so later changes to the
+# code format do not change what it does.
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+LENGTH = 8
+BITS = 5 * LENGTH
+MASK = (1 << BITS) - 1
+MULTIPLIERS = (0x5DEECE66D, 0x9E3779B97)
+SEQUENCE_NAME = 'reservation_code'
+
+
+def scramble(number):
+    for multiplier in MULTIPLIERS:
+        number = (number * multiplier) & MASK
+        number ^= number >> (BITS // 2)
+    return number
+
+
+def encode(number):
+    number = scramble(number)
+    chars = []
+    for _ in range(LENGTH):
+        number, index = divmod(number, 32)
+        chars.append(ALPHABET[index])
+    return ''.join(reversed(chars))
+
+
+def deduplicate_codes(apps, schema_editor):
+    """Give a new code to every reservation sharing its code with an older one."""
+    Reservation = apps.get_model('reservations', 'Reservation')
+    Sequence = apps.get_model('reservations', 'Sequence')
+
+    duplicated = (
+        Reservation.objects.values('code')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('code', flat=True)
+    )
+    sequence, _ = Sequence.objects.get_or_create(name=SEQUENCE_NAME)
+    for code in list(duplicated):
+        for reservation in Reservation.objects.filter(code=code).order_by('created_at')[1:]:
+            sequence.value += 1
+            reservation.code = encode(sequence.value)
+            reservation.save(update_fields=['code'])
+    sequence.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_occupancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Name')),
+                ('value', models.PositiveBigIntegerField(default=0, verbose_name='Value')),
+            ],
+            options={
+                'verbose_name': 'Sequence',
+                'verbose_name_plural': 'Sequences',
+            },
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='code',
+            field=models.CharField(editable=False, max_length=8, verbose_name='Code'),
+        ),
+        migrations.RunPython(deduplicate_codes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0006_sequence_reservation_code'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='code',
+            field=models.CharField(editable=False, max_length=8, unique=True, verbose_name='Code'),
+        ),
+    ]
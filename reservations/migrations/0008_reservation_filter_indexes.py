@@ -0,0 +1,25 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0007_alter_reservation_code'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['listing', 'check_in'], name='reservation_listing_in_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['check_in'], name='reservation_check_in_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['check_out'], name='reservation_check_out_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0008_reservation_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['updated_at'], name='reservation_updated_at_idx'),
+        ),
+    ]
@@ -3,10 +3,23 @@ import uuid
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from . import codes
+
+
+class ReservationQuerySet(models.QuerySet):
+
+    def overlapping(self, check_in, check_out):
+        """Return reservations whose stay overlaps [check_in, check_out).
+
+        A reservation checking out on the day another checks in does not
+        overlap it.
+        """
+        return self.filter(check_out__gt=check_in, check_in__lt=check_out)
+
 
 class Reservation(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    code = models.CharField(_('Code'), max_length=6, editable=False)
+    code = models.CharField(_('Code'), max_length=8, unique=True, editable=False)
     check_in = models.DateField(_('Check-in'))
     check_out = models.DateField(_('Check-out'))
     price = models.DecimalField(_('Price'), max_digits=11, decimal_places=2)
@@ -19,11 +32,64 @@ class Reservation(models.Model):
         'listings.Listing', on_delete=models.SET_NULL, null=True,
         verbose_name=_('Listing'))
 
+    objects = ReservationQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Reservation')
         verbose_name_plural = _('Reservations')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='reservation_created_at_id_idx'),
+            models.Index(fields=['updated_at'], name='reservation_updated_at_idx'),
+            models.Index(
+                fields=['listing', 'check_out', 'check_in'], name='reservation_listing_dates_idx'),
+            models.Index(fields=['listing', 'check_in'], name='reservation_listing_in_idx'),
+            models.Index(fields=['check_in'], name='reservation_check_in_idx'),
+            models.Index(fields=['check_out'], name='reservation_check_out_idx'),
+        ]
 
     def save(self, *args, **kwargs):
-        self.code = uuid.uuid4().hex[:6].upper()
+        if not self.code:
+            self.code = codes.allocate(1)[0]
         super().save(*args, **kwargs)
+
+
+class Occupancy(models.Model):
+
+    """Nights booked on a property during a year, one bit per day.
+
+    Bit `n` (starting at 0 for January 1st) is set when the night starting on
+    that day is booked. It is kept up to date by `reservations.occupancy`
+    so availability can be answered without reading reservations.
+    """
+
+    property = models.ForeignKey(
+        'properties.Property', on_delete=models.CASCADE, related_name='occupancies',
+        verbose_name=_('Property'))
+    year = models.PositiveSmallIntegerField(_('Year'))
+    days = models.BinaryField(_('Days'), max_length=46)
+
+    class Meta:
+        verbose_name = _('Occupancy')
+        verbose_name_plural = _('Occupancies')
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'year'], name='occupancy_property_year_unique'),
+        ]
+
+    def __str__(self):
+        return '{} {}'.format(self.property_id, self.year)
+
+
+class Sequence(models.Model):
+
+    """Named counter used to allocate unique numbers, see `reservations.codes`."""
+
+    name = models.CharField(_('Name'), max_length=50, primary_key=True)
+    value = models.PositiveBigIntegerField(_('Value'), default=0)
+
+    class Meta:
+        verbose_name = _('Sequence')
+        verbose_name_plural = _('Sequences')
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,122 @@
+"""Per-property occupancy bitmaps.
+
+Each `Occupancy` row stores one bit per day of a year for a property. Bits are
+set when a reservation is created and the affected years are rebuilt from the
+reservations table when a reservation is changed or deleted, or moves to
+another property with its listing.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Occupancy, Reservation
+
+YEAR_BYTES = 46  # 366 days
+
+
+def split_by_year(start, end):
+    """Yield `(year, start, end)` for each year covered by [start, end)."""
+    while start < end:
+        year_end = datetime.date(start.year + 1, 1, 1)
+        yield start.year, start, min(end, year_end)
+        start = year_end
+
+
+def set_nights(days, start, end):
+    """Set the bits of the nights in [start, end), both in the same year."""
+    first = start.timetuple().tm_yday - 1
+    for day in range(first, first + (end - start).days):
+        days[day // 8] |= 1 << (day % 8)
+
+
+def is_booked(days, date):
+    day = date.timetuple().tm_yday - 1
+    return bool(days[day // 8] & (1 << (day % 8)))
+
+
+def mark(property_id, check_in, check_out):
+    """Mark the nights of a new reservation as booked."""
+    mark_many([(property_id, check_in, check_out)])
+
+
+def mark_many(stays):
+    """Mark the nights of new reservations as booked.
+
+    `stays` are `(property_id, check_in, check_out)` tuples. Each affected
+    bitmap is read and written once.
+    """
+    nights = defaultdict(list)
+    for property_id, check_in, check_out in stays:
+        for year, start, end in split_by_year(check_in, check_out):
+            nights[property_id, year].append((start, end))
+
+    with transaction.atomic():
+        for (property_id, year), ranges in nights.items():
+            occupancy, _ = Occupancy.objects.select_for_update().get_or_create(
+                property_id=property_id, year=year,
+                defaults={'days': bytes(YEAR_BYTES)})
+            days = bytearray(occupancy.days)
+            for start, end in ranges:
+                set_nights(days, start, end)
+            occupancy.days = bytes(days)
+            occupancy.save(update_fields=['days'])
+
+
+def rebuild(property_id, years):
+    """Recompute the occupancy of a property for the given years."""
+    with transaction.atomic():
+        for year in years:
+            year_start = datetime.date(year, 1, 1)
+            year_end = datetime.date(year + 1, 1, 1)
+            days = bytearray(YEAR_BYTES)
+            stays = (
+                Reservation.objects
+                .filter(listing__property=property_id)
+                .overlapping(year_start, year_end)
+                .order_by()
+                .values_list('check_in', 'check_out')
+            )
+            for check_in, check_out in stays:
+                set_nights(days, max(check_in, year_start), min(check_out, year_end))
+            Occupancy.objects.update_or_create(
+                property_id=property_id, year=year, defaults={'days': bytes(days)})
+
+
+def rebuild_property(property_id):
+    """Recompute every year of a property, e.g. after reservations moved to or from it."""
+    stays = (
+        Reservation.objects
+        .filter(listing__property=property_id)
+        .order_by()
+        .values_list('check_in', 'check_out')
+    )
+    years = set()
+    for check_in, check_out in stays.iterator():
+        years.update(year for year, _, _ in split_by_year(check_in, check_out))
+    with transaction.atomic():
+        Occupancy.objects.filter(property_id=property_id).exclude(year__in=years).delete()
+        rebuild(property_id, sorted(years))
+
+
+def booked_nights(property_id, start, end):
+    """Return the booked nights of a property in [start, end)."""
+    if start >= end:
+        return []
+    occupancies = dict(
+        Occupancy.objects
+        .filter(property_id=property_id, year__gte=start.year, year__lte=end.year)
+        .values_list('year', 'days')
+    )
+    booked = []
+    for year, year_start, year_end in split_by_year(start, end):
+        days = occupancies.get(year)
+        if days is None:
+            continue
+        date = year_start
+        while date < year_end:
+            if is_booked(days, date):
+                booked.append(date)
+            date += datetime.timedelta(days=1)
+    return booked
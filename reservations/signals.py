@@ -0,0 +1,106 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.signals import post_bulk_create, pre_bulk_create
+from listings.models import Listing
+
+from . import codes, occupancy
+from .models import Occupancy, Reservation
+
+
+def get_property_id(reservation):
+    if reservation.listing_id is None:
+        return None
+    if Reservation.listing.is_cached(reservation):
+        return reservation.listing.property_id
+    return Listing.objects.filter(pk=reservation.listing_id).values_list(
+        'property_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_property(sender, instance, **kwargs):
+    """Keep the property of a changed reservation, its listing may change."""
+    if not instance._state.adding:
+        instance._previous_property_id = Reservation.objects.filter(pk=instance.pk).values_list(
+            'listing__property', flat=True).first()
+
+
+@receiver(post_save, sender=Reservation)
+def update_occupancy(sender, instance, created, **kwargs):
+    property_id = get_property_id(instance)
+    previous_property_id = getattr(instance, '_previous_property_id', None)
+    if previous_property_id is not None and previous_property_id != property_id:
+        occupancy.rebuild_property(previous_property_id)
+    if property_id is None:
+        return
+    if created:
+        occupancy.mark(property_id, instance.check_in, instance.check_out)
+    else:
+        # The previous dates are unknown, rebuild every year we know about.
+        years = set(Occupancy.objects.filter(property_id=property_id).values_list('year', flat=True))
+        years.update(year for year, _, _ in occupancy.split_by_year(instance.check_in, instance.check_out))
+        occupancy.rebuild(property_id, sorted(years))
+
+
+@receiver(post_delete, sender=Reservation)
+def release_occupancy(sender, instance, **kwargs):
+    property_id = get_property_id(instance)
+    if property_id is None:
+        return
+    years = [year for year, _, _ in occupancy.split_by_year(instance.check_in, instance.check_out)]
+    occupancy.rebuild(property_id, years)
+
+
+@receiver(pre_save, sender=Listing)
+def remember_listing_property(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_property_id = Listing.objects.filter(pk=instance.pk).values_list(
+            'property', flat=True).first()
+
+
+@receiver(post_save, sender=Listing)
+def move_occupancy(sender, instance, created, **kwargs):
+    """Move the nights of a listing's reservations when it changes property."""
+    previous_property_id = getattr(instance, '_previous_property_id', None)
+    if created or previous_property_id == instance.property_id:
+        return
+    for property_id in (previous_property_id, instance.property_id):
+        if property_id is not None:
+            occupancy.rebuild_property(property_id)
+
+
+@receiver(pre_delete, sender=Listing)
+def touch_listing_reservations(sender, instance, using, **kwargs):
+    """Reservations of a deleted listing lose their listing without a save, date the change."""
+    Reservation.objects.using(using).filter(listing=instance.pk).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Listing)
+def release_listing_occupancy(sender, instance, **kwargs):
+    """Reservations of a deleted listing are kept without listing, free their nights."""
+    if instance.property_id is not None:
+        occupancy.rebuild_property(instance.property_id)
+
+
+@receiver(pre_bulk_create, sender=Reservation)
+def allocate_codes(sender, instances, **kwargs):
+    """Give a code to reservations created in bulk, as `Reservation.save` does."""
+    missing = [instance for instance in instances if not instance.code]
+    for instance, code in zip(missing, codes.allocate(len(missing))):
+        instance.code = code
+
+
+@receiver(post_bulk_create, sender=Reservation)
+def mark_occupancy(sender, instances, **kwargs):
+    listing_ids = {instance.listing_id for instance in instances if instance.listing_id is not None}
+    property_ids = dict(
+        Listing.objects
+        .filter(pk__in=listing_ids, property__isnull=False)
+        .values_list('pk', 'property_id')
+    )
+    occupancy.mark_many(
+        (property_ids[instance.listing_id], instance.check_in, instance.check_out)
+        for instance in instances
+        if instance.listing_id in property_ids
+    )
@@ -1,3 +1,28 @@
 from django.test import TestCase
 
-# Create your tests here.
+from . import codes
+
+
+class CodeTests(TestCase):
+
+    def test_codes_are_unique(self):
+        """
+        Ensure different numbers never share a code.
+        """
+        generated = [codes.encode(number) for number in range(1, 100001)]
+        self.assertEqual(len(generated), len(set(generated)))
+        self.assertTrue(all(len(code) == codes.LENGTH for code in generated))
+
+    def test_allocate(self):
+        """
+        Ensure allocated codes are unique across calls.
+        """
+        allocated = codes.allocate(3) + codes.allocate(codes.BLOCK_SIZE + 1) + codes.allocate(1)
+        self.assertEqual(len(allocated), len(set(allocated)))
+
+    def test_normalize(self):
+        """
+        Ensure ambiguous characters typed by guests are normalized.
+        """
+        self.assertEqual('01ABC1', codes.normalize('oiabcl'))
+        self.assertEqual('67DE97', codes.normalize('67de97'))